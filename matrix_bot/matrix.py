@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from contextlib import nullcontext
 from typing import Dict, Optional
 
 from nio import AsyncClient, AsyncClientConfig, LoginResponse, MembersSyncError, RoomSendError
@@ -46,8 +48,9 @@ async def login_or_restore(
         client.access_token = creds["access_token"]
         client.user_id = creds["user_id"]
         client.device_id = creds["device_id"]
+        # Loading the Olm store reads and decrypts sqlite state; keep it off the loop.
         try:
-            client.load_store()
+            await asyncio.to_thread(client.load_store)
         except Exception:
             pass
         return client
@@ -57,7 +60,7 @@ async def login_or_restore(
 
     resp = await client.login(bot_password)
     if isinstance(resp, LoginResponse):
-        save_creds(creds_path, resp.access_token, resp.device_id, resp.user_id)
+        await asyncio.to_thread(save_creds, creds_path, resp.access_token, resp.device_id, resp.user_id)
         return client
 
     raise RuntimeError(f"Login failed: {resp}")
@@ -126,7 +129,12 @@ class MatrixMessenger:
 
 
 def auto_trust_devices(client: AsyncClient) -> None:
-    for device in client.device_store:
-        if device.deleted or device.blacklisted or device.verified:
-            continue
-        client.verify_device(device)
+    # Runs on every sync; usually nothing is pending and the store is not touched.
+    pending = [d for d in client.device_store if not (d.deleted or d.blacklisted or d.verified)]
+    if not pending:
+        return
+    # Each verify_device is a store write; one transaction means one sqlite commit.
+    database = getattr(client.store, "database", None)
+    with database.atomic() if database is not None else nullcontext():
+        for device in pending:
+            client.verify_device(device)
@@ -10,12 +10,16 @@ class DummyMessenger:
     def __init__(self, user_id: str = "@bot:example.org") -> None:
         self.client = DummyClient(user_id)
         self.sent: list[tuple[str, str]] = []
+        self.edits: list[tuple[str, str, str]] = []
         self.typing: list[tuple[str, bool]] = []
 
     async def send_text(self, room_id: str, body: str) -> str:
         self.sent.append((room_id, body))
         return "event-id"
 
+    async def edit_text(self, room_id: str, original_event_id: str, new_body: str) -> None:
+        self.edits.append((room_id, original_event_id, new_body))
+
     async def set_typing(self, room_id: str, is_typing: bool) -> None:
         self.typing.append((room_id, is_typing))
 
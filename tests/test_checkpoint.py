@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 
 import pytest
@@ -39,3 +40,74 @@ async def test_file_backed_saver_persists_state(tmp_path: Path):
 
     assert path.exists()
     assert active_id in result2["responses"][0]
+
+
+@pytest.mark.asyncio
+async def test_file_backed_saver_writes_once_per_invoke(tmp_path: Path):
+    saver = FileBackedSaver(str(tmp_path / "graph_state.pkl"))
+    persisted = []
+    original_persist = saver._persist
+
+    def counting_persist() -> None:
+        persisted.append(True)
+        original_persist()
+
+    saver._persist = counting_persist
+    graph = YabotGraph(
+        llm=DummyLLM(),
+        default_model="gpt-4o-mini",
+        available_models=["gpt-4o-mini"],
+        max_turns=3,
+        skills=SkillRegistry([]),
+        checkpointer=saver,
+    )
+
+    await graph.ainvoke("room1", "!new")
+
+    assert len(persisted) == 1
+    assert saver.path.exists()
+
+
+@pytest.mark.asyncio
+async def test_file_backed_saver_debounces_writes_across_invokes(tmp_path: Path):
+    saver = FileBackedSaver(str(tmp_path / "graph_state.pkl"), flush_delay=0.05)
+    persisted = []
+    original_persist = saver._persist
+
+    def counting_persist() -> None:
+        persisted.append(True)
+        original_persist()
+
+    saver._persist = counting_persist
+    graph = YabotGraph(
+        llm=DummyLLM(),
+        default_model="gpt-4o-mini",
+        available_models=["gpt-4o-mini"],
+        max_turns=3,
+        skills=SkillRegistry([]),
+        checkpointer=saver,
+    )
+
+    await graph.ainvoke("room1", "!new")
+    await graph.ainvoke("room2", "!new")
+    assert persisted == []
+
+    await asyncio.sleep(0.1)
+
+    assert len(persisted) == 1
+    assert saver.path.exists()
+
+
+def test_file_backed_saver_reschedules_after_its_loop_closes(tmp_path: Path):
+    saver = FileBackedSaver(str(tmp_path / "graph_state.pkl"), flush_delay=0.05)
+
+    async def mark_dirty(wait: float) -> None:
+        saver._mark_dirty()
+        await asyncio.sleep(wait)
+
+    # The first loop closes before its timer fires; the next loop must schedule its own.
+    asyncio.run(mark_dirty(0))
+    assert not saver.path.exists()
+    asyncio.run(mark_dirty(0.1))
+
+    assert saver.path.exists()
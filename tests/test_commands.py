@@ -1,9 +1,12 @@
+import asyncio
+import gc
 import json
 
 import pytest
 
 from langgraph.checkpoint.memory import MemorySaver
 
+from yabot.commands import agent_active_conv, ensure_state, trim_messages
 from yabot.graph import YabotGraph
 from yabot.skills import SkillRegistry
 
@@ -200,3 +203,66 @@ async def test_plan_resumes_after_approval_with_tool_output():
     assert any("done one" in r for r in result["responses"])
     assert any("[system] Step 2/2" in r for r in result["responses"])
     assert any("done two" in r for r in result["responses"])
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_batch_returns_results_in_order():
+    graph = YabotGraph(
+        llm=EchoLLM(),
+        default_model="gpt-4o-mini",
+        available_models=["gpt-4o-mini"],
+        max_turns=3,
+        skills=SkillRegistry([]),
+        checkpointer=MemorySaver(),
+    )
+
+    results = await graph.ainvoke_batch(
+        [("room1", "hello"), ("room2", "!models"), ("room3", "hi")],
+        concurrency=2,
+    )
+
+    assert len(results) == 3
+    assert results[0]["responses"] == ["ok"]
+    assert results[1]["responses"][0].startswith("Available models:")
+    assert results[2]["responses"] == ["ok"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_turns_in_one_room_both_persist():
+    graph = YabotGraph(
+        llm=EchoLLM(),
+        default_model="gpt-4o-mini",
+        available_models=["gpt-4o-mini"],
+        max_turns=3,
+        skills=SkillRegistry([]),
+        checkpointer=MemorySaver(),
+    )
+
+    await asyncio.gather(graph.ainvoke("room1", "first"), graph.ainvoke("room1", "second"))
+
+    state = graph.graph.get_state({"configurable": {"thread_id": "room1"}}).values
+    _, conv = agent_active_conv(state, state["active_agent"])
+    user_texts = [m["content"] for m in conv["messages"] if m["role"] == "user"]
+    assert user_texts == ["first", "second"]
+    gc.collect()
+    assert "room1" not in graph._room_locks
+
+
+def test_ensure_state_converts_legacy_approval_lists():
+    state = {"approvals": {"shell": ["ls\n", "ls\n"], "dirs": ["/tmp"], "pending": None}}
+
+    ensure_state(state, "gpt-4o-mini")
+
+    assert state["approvals"]["shell"] == {"ls\n"}
+    assert state["approvals"]["dirs"] == {"/tmp"}
+
+
+def test_trim_messages_drops_history_in_blocks():
+    system = {"role": "system", "content": "sys"}
+    history = [{"role": "user", "content": f"m{i}"} for i in range(9)]
+
+    trimmed = trim_messages([system] + history, "gpt-4o-mini", max_turns=4)
+    assert trimmed == [system] + history[3:]
+
+    grown = trimmed + [{"role": "assistant", "content": "a"}, {"role": "user", "content": "b"}]
+    assert trim_messages(grown, "gpt-4o-mini", max_turns=4) is grown
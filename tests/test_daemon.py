@@ -1,10 +1,13 @@
 import asyncio
+import json
+import logging
+
 import pytest
 import websockets
 
-from yabot.daemon import YabotDaemon
+from yabot.daemon import YabotDaemon, _ChunkSender
 from yabot.remote import RemoteGraphClient
-from yabot.ws_protocol import ClientMessage, parse_json
+from yabot.ws_protocol import ClientMessage, ServerMessage, parse_json, stream_frame_encoder
 
 
 class StatefulGraph:
@@ -92,3 +95,123 @@ async def test_daemon_streams_tokens():
 
     assert "".join(chunks) == "hello"
     assert result["responses"] == ["hello"]
+
+
+class SlowSocket:
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    async def send(self, frame: str) -> None:
+        await asyncio.sleep(0.01)
+        self.sent.append(frame)
+
+
+@pytest.mark.asyncio
+async def test_chunk_sender_merges_tokens_while_a_send_is_in_flight():
+    socket = SlowSocket()
+    sender = _ChunkSender(socket, lambda text: text)
+
+    for token in ["a", "b", "c"]:
+        await sender.push(token)
+    await sender.flush()
+
+    assert socket.sent == ["abc"]
+
+
+class ClosedSocket:
+    async def send(self, frame: str) -> None:
+        raise ConnectionError("closed")
+
+
+@pytest.mark.asyncio
+async def test_chunk_sender_settle_swallows_failed_sends():
+    sender = _ChunkSender(ClosedSocket(), lambda text: text)
+    await sender.push("lost")
+
+    await sender.settle(logging.getLogger("test"))
+    with pytest.raises(ConnectionError):
+        await sender.flush()
+
+
+class StuckSocket:
+    closed = False
+
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    async def send(self, frame: str) -> None:
+        self.sent.append(frame)
+        await asyncio.Event().wait()
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_remote_client_close_rejects_queued_requests():
+    client = RemoteGraphClient("ws://unused")
+    socket = StuckSocket()
+    client._ws = socket
+    client._sender_task = asyncio.create_task(client._sender_loop())
+    calls = [asyncio.create_task(client.ainvoke("room", text)) for text in ("first", "queued")]
+    await asyncio.sleep(0.01)
+
+    await client.close()
+
+    for call in calls:
+        with pytest.raises(RuntimeError, match="Connection closed"):
+            await asyncio.wait_for(call, 1.0)
+    assert len(socket.sent) == 1
+    assert client._send_queue.empty()
+
+
+def test_server_message_serializes_approval_sets():
+    result = {"approvals": {"shell": {"b\n", "a\n"}, "dirs": set(), "pending": None}}
+
+    payload = parse_json(ServerMessage(type="response", id="1", room_id="room", result=result).to_json())
+
+    assert payload["result"]["approvals"] == {"shell": ["a\n", "b\n"], "dirs": [], "pending": None}
+
+
+def test_stream_frame_encoder_matches_server_message():
+    encode = stream_frame_encoder("req-1", "room")
+
+    for chunk in ["hello", 'quote " and \\ slash', "ünïcode\n"]:
+        assert encode(chunk) == ServerMessage(type="stream", id="req-1", room_id="room", chunk=chunk).to_json()
+
+
+def test_server_message_iter_json_matches_to_json():
+    result = {"content": "x" * 5000, "approvals": {"shell": {"ls\n"}, "dirs": set()}, "empty": {}}
+    message = ServerMessage(type="response", id="1", room_id="room", result=result)
+
+    frames = list(message.iter_json(frame_chars=1024))
+
+    assert len(frames) > 1
+    assert "".join(frames) == message.to_json()
+    empty = ServerMessage(type="response", id="1", room_id="room", result={}, ok=True)
+    assert "".join(empty.iter_json()) == empty.to_json()
+
+
+def test_server_message_iter_json_writes_non_str_keys_like_json_dumps():
+    message = ServerMessage(type="response", id="1", room_id="room", result={1: "a", "b": 2})
+
+    text = "".join(message.iter_json())
+
+    payload = {"type": "response", "id": "1", "room_id": "room", "result": {1: "a", "b": 2}}
+    assert text == json.dumps(payload, separators=(",", ":"))
+    assert parse_json(text)["result"] == {"1": "a", "b": 2}
+
+
+def test_parse_json_accepts_bytes_and_rejects_non_objects():
+    assert parse_json(b'{"type":"stop"}') == {"type": "stop"}
+    with pytest.raises(AssertionError):
+        parse_json("[1, 2]")
+
+
+def test_client_message_to_json_matches_json_dumps():
+    for text in [None, 'quote " \\ and ünïcode\n']:
+        message = ClientMessage(type="message", id="1", room_id="!room:example.org", text=text)
+        payload = {"type": "message", "id": "1", "room_id": "!room:example.org"}
+        if text is not None:
+            payload["text"] = text
+        assert message.to_json() == json.dumps(payload, separators=(",", ":"))
@@ -1,8 +1,9 @@
 import asyncio
+import time
 
 import pytest
 
-from yabot.handler import BotHandler
+from yabot.handler import BotHandler, coalesce_responses
 from yabot.streams import StreamRegistry
 
 
@@ -59,3 +60,217 @@ async def test_on_message_runs_llm_and_updates_state(messenger):
     assert len(graph.calls) == 1
     assert streams.stop("room1") is False
     assert messenger.sent[-1][1] == "hello there"
+
+
+class SlowGraph:
+    def __init__(self) -> None:
+        self.running = 0
+        self.peak = 0
+
+    async def ainvoke(self, room_id: str, text: str):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return {"responses": [text]}
+
+
+@pytest.mark.asyncio
+async def test_on_message_caps_concurrent_turns(messenger):
+    graph = SlowGraph()
+    handler = BotHandler(
+        messenger=messenger,
+        graph=graph,
+        streams=StreamRegistry(),
+        allowed_users=[],
+        max_concurrent_turns=2,
+    )
+
+    await asyncio.gather(
+        *(handler.on_message(DummyRoom(f"room{i}"), DummyEvent("@alice:example.org", "hi")) for i in range(5))
+    )
+
+    assert graph.peak == 2
+    assert len(messenger.sent) == 5
+
+
+class BusyRoomGraph:
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.calls: list[str] = []
+
+    async def ainvoke(self, room_id: str, text: str):
+        self.calls.append(room_id)
+        if room_id == "busy":
+            await self.release.wait()
+        return {"responses": [text]}
+
+
+@pytest.mark.asyncio
+async def test_backlog_in_one_room_does_not_hold_every_slot(messenger):
+    graph = BusyRoomGraph()
+    handler = BotHandler(
+        messenger=messenger,
+        graph=graph,
+        streams=StreamRegistry(),
+        allowed_users=[],
+        max_concurrent_turns=2,
+    )
+    busy = [
+        asyncio.create_task(handler.on_message(DummyRoom("busy"), DummyEvent("@alice:example.org", f"m{i}")))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(handler.on_message(DummyRoom("quiet"), DummyEvent("@alice:example.org", "hi")), 1.0)
+
+    assert graph.calls == ["busy", "quiet"]
+    graph.release.set()
+    await asyncio.gather(*busy)
+    assert graph.calls == ["busy", "quiet", "busy", "busy"]
+
+
+class StreamingGraph:
+    async def ainvoke(self, room_id: str, text: str):
+        raise AssertionError("streaming replies should use ainvoke_stream")
+
+    async def ainvoke_stream(self, room_id: str, text: str, on_token):
+        for chunk in ["Hel", "lo", " there"]:
+            await on_token(chunk)
+        return {"responses": ["Hello there", "Second paragraph"]}
+
+
+@pytest.mark.asyncio
+async def test_on_message_streams_into_one_edited_message(messenger):
+    handler = BotHandler(
+        messenger=messenger,
+        graph=StreamingGraph(),
+        streams=StreamRegistry(),
+        allowed_users=[],
+        edit_interval=60.0,
+    )
+
+    await handler.on_message(DummyRoom("room1"), DummyEvent("@alice:example.org", "hi"))
+
+    assert messenger.sent == [("room1", "Hel")]
+    assert messenger.edits == [("room1", "event-id", "Hello there\n\nSecond paragraph")]
+
+
+class PlanningGraph:
+    async def ainvoke_stream(self, room_id: str, text: str, on_token):
+        # Mirrors YabotGraph: the plan is only streamed, step headers are also returned.
+        for chunk in ["[system] Plan:\n- a\n- b\n", "[system] Step 1/2: a\n", "done"]:
+            await on_token(chunk)
+        return {"responses": ["[system] Step 1/2: a", "done"]}
+
+
+@pytest.mark.asyncio
+async def test_streaming_reply_keeps_streamed_plan_in_final_edit(messenger):
+    handler = BotHandler(
+        messenger=messenger,
+        graph=PlanningGraph(),
+        streams=StreamRegistry(),
+        allowed_users=[],
+        edit_interval=60.0,
+    )
+
+    await handler.on_message(DummyRoom("room1"), DummyEvent("@alice:example.org", "hi"))
+
+    assert messenger.edits[-1][2] == "[system] Plan:\n- a\n- b\n\n[system] Step 1/2: a\n\ndone"
+
+
+class SlowEditMessenger:
+    def __init__(self) -> None:
+        self.sent: list[tuple[str, str]] = []
+        self.edits: list[str] = []
+        self.client = type("Client", (), {"user_id": "@bot:example.org"})()
+
+    async def send_text(self, room_id: str, body: str) -> str:
+        self.sent.append((room_id, body))
+        return "event-id"
+
+    async def edit_text(self, room_id: str, original_event_id: str, new_body: str) -> None:
+        await asyncio.sleep(0.05)
+        self.edits.append(new_body)
+
+
+@pytest.mark.asyncio
+async def test_streaming_edits_do_not_block_tokens():
+    messenger = SlowEditMessenger()
+    handler = BotHandler(
+        messenger=messenger,
+        graph=StreamingGraph(),
+        streams=StreamRegistry(),
+        allowed_users=[],
+        edit_interval=0.001,
+    )
+
+    await handler.on_message(DummyRoom("room1"), DummyEvent("@alice:example.org", "hi"))
+
+    assert messenger.sent == [("room1", "Hel")]
+    assert messenger.edits[-1] == "Hello there\n\nSecond paragraph"
+    assert len(messenger.edits) <= 2
+
+
+class SlowSendMessenger(SlowEditMessenger):
+    async def send_text(self, room_id: str, body: str) -> str:
+        await asyncio.sleep(0.05)
+        return await super().send_text(room_id, body)
+
+
+class TimedStreamingGraph(StreamingGraph):
+    async def ainvoke_stream(self, room_id: str, text: str, on_token):
+        started = time.monotonic()
+        result = await super().ainvoke_stream(room_id, text, on_token)
+        self.stream_seconds = time.monotonic() - started
+        return result
+
+
+@pytest.mark.asyncio
+async def test_streaming_first_post_does_not_block_tokens():
+    messenger = SlowSendMessenger()
+    graph = TimedStreamingGraph()
+    handler = BotHandler(
+        messenger=messenger,
+        graph=graph,
+        streams=StreamRegistry(),
+        allowed_users=[],
+        edit_interval=0.001,
+    )
+
+    await handler.on_message(DummyRoom("room1"), DummyEvent("@alice:example.org", "hi"))
+
+    assert graph.stream_seconds < 0.05
+    assert messenger.sent == [("room1", "Hel")]
+    assert messenger.edits == ["Hello there\n\nSecond paragraph"]
+
+
+class FailingFirstSendMessenger(SlowEditMessenger):
+    async def send_text(self, room_id: str, body: str) -> str:
+        self.sent.append((room_id, body))
+        # matrix_bot's messenger returns "" when room_send fails.
+        return "" if len(self.sent) == 1 else "event-id"
+
+
+@pytest.mark.asyncio
+async def test_streaming_reply_falls_back_to_send_when_first_post_fails():
+    messenger = FailingFirstSendMessenger()
+    handler = BotHandler(
+        messenger=messenger,
+        graph=StreamingGraph(),
+        streams=StreamRegistry(),
+        allowed_users=[],
+        edit_interval=0.001,
+    )
+
+    await handler.on_message(DummyRoom("room1"), DummyEvent("@alice:example.org", "hi"))
+
+    assert messenger.sent == [("room1", "Hel"), ("room1", "Hello there\n\nSecond paragraph")]
+    assert messenger.edits == []
+
+
+def test_coalesce_responses_merges_short_bodies_in_order():
+    bodies = ["one", "two", "x" * 20, "three"]
+
+    assert coalesce_responses(bodies, 12) == ["one\n\ntwo", "x" * 20, "three"]
+    assert coalesce_responses(bodies, 0) == bodies
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from yabot.llm import LLMClient, close_shared_clients, shared_http_client
+
+
+class FakeStream:
+    def __init__(self, events) -> None:
+        self._events = iter(events)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._events)
+        except StopIteration as exc:
+            raise StopAsyncIteration from exc
+
+
+def _tool_delta(index: int, arguments: str, call_id: str | None = None, name: str | None = None):
+    function = SimpleNamespace(name=name, arguments=arguments)
+    delta = SimpleNamespace(content=None, tool_calls=[SimpleNamespace(index=index, id=call_id, function=function)])
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+@pytest.mark.asyncio
+async def test_stream_joins_tool_call_argument_deltas():
+    events = [
+        _tool_delta(0, '{"path": ', call_id="call-1", name="write_file"),
+        _tool_delta(1, '{"path": "b"}', call_id="call-2", name="read_file"),
+        _tool_delta(0, '"a", "content": '),
+        _tool_delta(0, '"hi"}'),
+    ]
+
+    async def create(**kwargs):
+        return FakeStream(events)
+
+    client = LLMClient(api_key="test")
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    message = await client.create_message_stream("gpt-4o-mini", [{"role": "user", "content": "go"}])
+
+    assert [call["function"]["arguments"] for call in message["tool_calls"]] == [
+        '{"path": "a", "content": "hi"}',
+        '{"path": "b"}',
+    ]
+    assert [call["id"] for call in message["tool_calls"]] == ["call-1", "call-2"]
+
+
+@pytest.mark.asyncio
+async def test_stream_orders_tool_calls_by_index():
+    events = [
+        _tool_delta(1, '{"path": "b"}', call_id="call-2", name="read_file"),
+        _tool_delta(0, '{"path": "a"}', call_id="call-1", name="read_file"),
+    ]
+
+    async def create(**kwargs):
+        return FakeStream(events)
+
+    client = LLMClient(api_key="test")
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    message = await client.create_message_stream("gpt-4o-mini", [{"role": "user", "content": "go"}])
+
+    assert [call["id"] for call in message["tool_calls"]] == ["call-1", "call-2"]
+
+
+def test_shared_http_client_is_per_loop_and_closed_on_shutdown():
+    async def open_and_close():
+        client = shared_http_client()
+        assert LLMClient(api_key="test").client is LLMClient(api_key="test").client
+        assert shared_http_client() is client
+        await close_shared_clients()
+        return client
+
+    first = asyncio.run(open_and_close())
+    second = asyncio.run(open_and_close())
+
+    assert first is not second
+    assert first.is_closed and second.is_closed
@@ -6,7 +6,7 @@ import pytest
 from langgraph.checkpoint.memory import MemorySaver
 
 from yabot.graph import YabotGraph
-from yabot.skills import Skill, SkillRegistry, load_skills
+from yabot.skills import Skill, SkillRegistry, _split_frontmatter, load_skills
 
 
 class DummyFunction:
@@ -74,6 +74,18 @@ def test_load_skills_from_dirs(tmp_path: Path) -> None:
     assert len(tool_names) == 2
 
 
+def test_split_frontmatter_slices_body() -> None:
+    frontmatter, body = _split_frontmatter("---\nname: Demo\ndescription: a: b\n---\nLine 1\nLine 2\n")
+
+    assert frontmatter == {"name": "Demo", "description": "a: b"}
+    assert body == "Line 1\nLine 2\n"
+    assert _split_frontmatter("---\nname: Demo\nno closing boundary") == (
+        None,
+        "---\nname: Demo\nno closing boundary",
+    )
+    assert _split_frontmatter("plain text") == (None, "plain text")
+
+
 @pytest.mark.asyncio
 async def test_skill_tool_injects_system_message():
     skill = Skill(
@@ -135,3 +135,26 @@ async def test_cli_clears_stale_plan_steps():
     await cli.run_async()
 
     assert "[system] Step" not in output.getvalue()
+
+
+def test_ensure_system_prompt_reinstalls_after_prompt_dropped():
+    graph = YabotGraph(
+        llm=SimpleLLM(),
+        default_model="gpt-4o-mini",
+        available_models=["gpt-4o-mini"],
+        max_turns=3,
+        skills=SkillRegistry([]),
+        checkpointer=MemorySaver(),
+        meta_system_prompt=meta_system_prompt(),
+    )
+    prompt = meta_system_prompt()
+    conv = {"messages": [{"role": "user", "content": "hi"}]}
+
+    graph._ensure_system_prompt(conv, prompt)
+    assert conv["_system_prompt_installed"] is True
+    assert conv["messages"][0] == {"role": "system", "content": prompt}
+
+    conv["messages"] = conv["messages"][1:]
+    graph._ensure_system_prompt(conv, prompt)
+    assert conv["messages"][0] == {"role": "system", "content": prompt}
+    assert len(conv["messages"]) == 2
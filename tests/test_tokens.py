@@ -11,3 +11,15 @@ def test_context_window_uses_models_json(tmp_path, monkeypatch):
     tokens._reset_models_context_cache_for_tests()
 
     assert tokens.context_window_for_model("gpt-4o-mini") == 12345
+
+
+def test_messages_upper_bound_covers_estimate():
+    encoding = tokens.get_encoding("gpt-4o-mini")
+    messages = [
+        {"role": "system", "content": "You are terse."},
+        {"role": "user", "content": "héllo wörld — ünïcode 🚀", "name": "alice"},
+        {"role": "assistant", "content": None, "tool_calls": [{"id": "1"}]},
+    ]
+
+    assert tokens.messages_tokens_upper_bound(messages) >= tokens.estimate_messages_tokens(messages, encoding)
+    assert tokens.messages_tokens_upper_bound([]) == 0
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from pathlib import Path
 
@@ -235,3 +236,147 @@ async def test_tool_messages_follow_tool_calls(tmp_path: Path):
 
     result = await graph.ainvoke("room1", "y")
     assert "done" in result["responses"]
+
+
+def test_dir_approval_covers_descendants_only(tmp_path: Path):
+    graph = YabotGraph(
+        llm=DummyLLM([]),
+        default_model="gpt-4o-mini",
+        available_models=["gpt-4o-mini"],
+        max_turns=3,
+        skills=SkillRegistry([]),
+        checkpointer=MemorySaver(),
+    )
+    state = {"approvals": {"shell": [], "dirs": [], "pending": None}}
+    approved = tmp_path / "proj"
+
+    graph._approve_dir(state, str(approved))
+
+    assert graph._is_dir_approved(state, str(approved))
+    assert graph._is_dir_approved(state, str(approved / "a" / "b"))
+    assert not graph._is_dir_approved(state, str(tmp_path / "proj2"))
+    assert not graph._is_dir_approved(state, str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_parallel_reads_keep_tool_call_order(tmp_path: Path):
+    first = tmp_path / "a.txt"
+    second = tmp_path / "b.txt"
+    first.write_text("alpha", encoding="utf-8")
+    second.write_text("beta", encoding="utf-8")
+    llm = DummyLLM(
+        [
+            DummyMessage(
+                tool_calls=[
+                    DummyToolCall("call-1", "read_file", json.dumps({"path": str(first)})),
+                    DummyToolCall("call-2", "read_file", json.dumps({"path": str(second)})),
+                ]
+            ),
+            DummyMessage(content="done"),
+        ]
+    )
+    graph = YabotGraph(
+        llm=llm,
+        default_model="gpt-4o-mini",
+        available_models=["gpt-4o-mini"],
+        max_turns=3,
+        skills=SkillRegistry([]),
+        checkpointer=MemorySaver(),
+    )
+
+    await graph.ainvoke("room1", "read both")
+    result = await graph.ainvoke("room1", "y")
+
+    assert "done" in result["responses"]
+    tool_messages = [m for m in llm.calls[-1] if m.get("role") == "tool"]
+    assert [(m["tool_call_id"], m["content"]) for m in tool_messages] == [
+        ("call-1", "alpha"),
+        ("call-2", "beta"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_parallel_reads_after_write_see_written_content(tmp_path: Path):
+    first = tmp_path / "a.txt"
+    second = tmp_path / "b.txt"
+    first.write_text("alpha", encoding="utf-8")
+    second.write_text("beta", encoding="utf-8")
+    llm = DummyLLM(
+        [
+            DummyMessage(
+                tool_calls=[
+                    DummyToolCall("call-1", "write_file", json.dumps({"path": str(first), "content": "gamma"})),
+                    DummyToolCall("call-2", "read_file", json.dumps({"path": str(first)})),
+                    DummyToolCall("call-3", "read_file", json.dumps({"path": str(second)})),
+                ]
+            ),
+            DummyMessage(content="done"),
+        ]
+    )
+    graph = YabotGraph(
+        llm=llm,
+        default_model="gpt-4o-mini",
+        available_models=["gpt-4o-mini"],
+        max_turns=3,
+        skills=SkillRegistry([]),
+        checkpointer=MemorySaver(),
+    )
+
+    await graph.ainvoke("room1", "rewrite a")
+    result = await graph.ainvoke("room1", "y")
+
+    assert "done" in result["responses"]
+    tool_messages = [m for m in llm.calls[-1] if m.get("role") == "tool"]
+    assert [m["content"] for m in tool_messages[1:]] == ["gamma", "beta"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_tool_batch_does_not_orphan_prefetched_reads(monkeypatch):
+    started: list[asyncio.Task] = []
+
+    async def slow_tool(name, arguments):
+        started.append(asyncio.current_task())
+        await asyncio.sleep(10)
+        return "late"
+
+    monkeypatch.setattr("yabot.graph.execute_tool_async", slow_tool)
+    graph = YabotGraph(
+        llm=DummyLLM([]),
+        default_model="gpt-4o-mini",
+        available_models=["gpt-4o-mini"],
+        max_turns=3,
+        skills=SkillRegistry([]),
+        checkpointer=MemorySaver(),
+    )
+    tool_calls = [
+        {"id": f"call-{name}", "function": {"name": "read_file", "arguments": json.dumps({"path": name})}}
+        for name in ("a", "b")
+    ]
+
+    task = asyncio.create_task(graph._execute_tool_calls({}, "main", tool_calls, {}, [], []))
+    while len(started) < 2:
+        await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert all(t.done() for t in started)
+
+
+def test_dir_approval_keeps_outermost_entries(tmp_path: Path):
+    graph = YabotGraph(
+        llm=DummyLLM([]),
+        default_model="gpt-4o-mini",
+        available_models=["gpt-4o-mini"],
+        max_turns=3,
+        skills=SkillRegistry([]),
+        checkpointer=MemorySaver(),
+    )
+    state = {"approvals": {"shell": [], "dirs": [], "pending": None}}
+
+    graph._approve_dir(state, str(tmp_path / "proj" / "src"))
+    graph._approve_dir(state, str(tmp_path / "other"))
+    graph._approve_dir(state, str(tmp_path / "proj"))
+    graph._approve_dir(state, str(tmp_path / "proj" / "docs"))
+
+    assert state["approvals"]["dirs"] == {str(tmp_path / "proj"), str(tmp_path / "other")}
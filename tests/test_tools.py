@@ -5,6 +5,7 @@ from yabot.tools.create_dir import create_dir
 from yabot.tools.list_dir import list_dir
 from yabot.tools.read_file import read_file
 from yabot.tools.run_shell import run_shell
+from yabot.tools.util import TRUNC_SUFFIX, truncate
 from yabot.tools.write_file import write_file
 
 
@@ -23,6 +24,12 @@ def test_read_file(tmp_path: Path) -> None:
     assert read_file(str(path)) == "hello"
 
 
+def test_truncate_bytes_decodes_only_the_head() -> None:
+    assert truncate("é".encode("utf-8") * 3, limit=5) == "ééé"
+    result = truncate("é".encode("utf-8") * 100, limit=5)
+    assert result == "ééééé" + TRUNC_SUFFIX
+
+
 def test_write_file(tmp_path: Path) -> None:
     path = tmp_path / "out.txt"
     result = write_file(str(path), "data")
@@ -30,6 +37,17 @@ def test_write_file(tmp_path: Path) -> None:
     assert "OK:" in result
 
 
+def test_write_file_missing_parent(tmp_path: Path) -> None:
+    result = write_file(str(tmp_path / "missing" / "out.txt"), "data")
+    assert result == f"ERROR: parent directory does not exist: {tmp_path / 'missing'}"
+
+
+def test_write_file_parent_is_a_file(tmp_path: Path) -> None:
+    (tmp_path / "file").write_text("x")
+    result = write_file(str(tmp_path / "file" / "out.txt"), "data")
+    assert result == f"ERROR: a path component is not a directory: {tmp_path / 'file'}"
+
+
 def test_create_dir(tmp_path: Path) -> None:
     path = tmp_path / "nested" / "dir"
     result = create_dir(str(path), exist_ok=True)
@@ -41,3 +59,10 @@ def test_run_shell(tmp_path: Path) -> None:
     payload = json.loads(run_shell("echo hi", workdir=str(tmp_path)))
     assert payload["returncode"] == 0
     assert payload["stdout"].strip() == "hi"
+
+
+def test_run_shell_caps_large_output(tmp_path: Path) -> None:
+    payload = json.loads(run_shell("yes x | head -c 1000000", workdir=str(tmp_path)))
+    assert payload["returncode"] == 0
+    assert payload["stdout"].endswith("...(truncated)")
+    assert len(payload["stdout"]) < 10000
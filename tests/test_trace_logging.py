@@ -1,4 +1,5 @@
 import json
+from datetime import datetime, timezone
 from pathlib import Path
 
 import pytest
@@ -44,3 +45,30 @@ async def test_trace_logger_writes_events(tmp_path: Path):
     events = {entry.get("event") for entry in payloads}
     assert "invoke" in events
     assert "response_final" in events or "invoke_result" in events
+
+
+def test_trace_logger_timestamps_are_utc_iso(tmp_path: Path):
+    trace_path = tmp_path / "trace.jsonl"
+    tracer = TraceLogger(trace_path)
+    tracer.log("first", {})
+    tracer.log("second", {"n": 2})
+    tracer.flush()
+
+    payloads = [json.loads(line) for line in trace_path.read_text(encoding="utf-8").splitlines()]
+    assert [entry["event"] for entry in payloads] == ["first", "second"]
+    for entry in payloads:
+        ts = datetime.fromisoformat(entry["ts"])
+        assert ts.tzinfo is not None
+        assert ts.utcoffset() == timezone.utc.utcoffset(None)
+
+
+@pytest.mark.skipif(not Path("/dev/full").exists(), reason="needs /dev/full")
+def test_trace_logger_write_failure_does_not_hang_flush(caplog):
+    tracer = TraceLogger(Path("/dev/full"))
+    tracer.log("lost", {})
+    tracer.flush(timeout=2)
+    tracer.log("lost again", {})
+    tracer.flush(timeout=2)
+
+    errors = [record for record in caplog.records if record.name == "yabot.trace"]
+    assert len(errors) == 1
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from yabot.util import retry_until_ok
+
+
+@pytest.mark.asyncio
+async def test_retry_until_ok_returns_on_success_after_failures():
+    calls = 0
+
+    async def attempt() -> None:
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise RuntimeError("not yet")
+
+    await asyncio.wait_for(retry_until_ok(attempt, delay_seconds=0.001, max_delay_seconds=0.002), timeout=1)
+
+    assert calls == 3
+
+
+@pytest.mark.asyncio
+async def test_retry_until_ok_cancel_wakes_waiting_retrier():
+    cancel = asyncio.Event()
+
+    async def attempt() -> None:
+        raise RuntimeError("down")
+
+    task = asyncio.create_task(retry_until_ok(attempt, delay_seconds=60.0, cancel_event=cancel))
+    await asyncio.sleep(0.01)
+    cancel.set()
+
+    await asyncio.wait_for(task, timeout=1)
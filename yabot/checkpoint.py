@@ -1,15 +1,26 @@
+import asyncio
+import atexit
 import pickle
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from langgraph.checkpoint.memory import InMemorySaver
 
 
 class FileBackedSaver(InMemorySaver):
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, flush_delay: float = 0.0) -> None:
         super().__init__()
+        assert flush_delay >= 0, "flush_delay must be non-negative"
         self.path = Path(path)
+        self.flush_delay = flush_delay
+        self._defer_depth = 0
+        self._dirty = False
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_loop: asyncio.AbstractEventLoop | None = None
         self._load()
+        if flush_delay:
+            atexit.register(self.flush)
 
     def _load(self) -> None:
         if not self.path.exists():
@@ -46,15 +57,58 @@ class FileBackedSaver(InMemorySaver):
         tmp.write_bytes(pickle.dumps(payload))
         tmp.replace(self.path)
 
+    @contextmanager
+    def deferred_writes(self) -> Iterator[None]:
+        # A graph run checkpoints after every step; inside this block those writes
+        # only mark the file dirty, and it is rewritten once when the block exits.
+        self._defer_depth += 1
+        try:
+            yield
+        finally:
+            self._defer_depth -= 1
+            self._schedule_flush()
+
+    def flush(self) -> None:
+        if self._dirty:
+            self._dirty = False
+            self._persist()
+
+    def _schedule_flush(self) -> None:
+        # With a flush delay, turns landing within the window (across rooms) share
+        # one rewrite of the file; pending changes are also flushed at exit.
+        if not self.flush_delay:
+            self.flush()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        # A timer left on a loop that has since closed never fires; schedule a new one.
+        if self._flush_handle is not None and self._flush_loop is loop:
+            return
+        self._flush_loop = loop
+        self._flush_handle = loop.call_later(self.flush_delay, self._debounced_flush)
+
+    def _debounced_flush(self) -> None:
+        self._flush_handle = None
+        self._flush_loop = None
+        self.flush()
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        if not self._defer_depth:
+            self._schedule_flush()
+
     def put(self, config, checkpoint, metadata, new_versions):
         result = super().put(config, checkpoint, metadata, new_versions)
-        self._persist()
+        self._mark_dirty()
         return result
 
     def put_writes(self, config, writes, task_id, task_path: str = "") -> None:
         super().put_writes(config, writes, task_id, task_path=task_path)
-        self._persist()
+        self._mark_dirty()
 
     def delete_thread(self, thread_id: str) -> None:
         super().delete_thread(thread_id)
-        self._persist()
+        self._mark_dirty()
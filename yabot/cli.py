@@ -20,6 +20,7 @@ from prompt_toolkit.patch_stdout import patch_stdout
 from .cli_runtime import ensure_daemon, spawn_daemon
 from .config import load_config
 from .interaction import is_stop_command, request_stop
+from .llm import close_shared_clients
 from .remote import RemoteGraphClient
 from .runtime import build_graph
 from .streams import StreamRegistry
@@ -282,6 +283,8 @@ class YabotCLI:
     async def _close_remote(self) -> None:
         if isinstance(self.graph, RemoteGraphClient):
             await self.graph.close()
+        else:
+            await close_shared_clients()
         if self._daemon_retry_task is not None:
             self._daemon_retry_task.cancel()
             self._daemon_retry_task = None
@@ -314,7 +317,9 @@ class YabotCLI:
             await self.graph.connect()
             await self._set_daemon_state(self.DaemonState.CONNECTED, "[system] Daemon connected.")
 
-        await retry_until_ok(attempt, delay_seconds=1.0, cancel_event=self._daemon_retry_stop)
+        await retry_until_ok(
+            attempt, delay_seconds=1.0, cancel_event=self._daemon_retry_stop, max_delay_seconds=8.0
+        )
 
     async def _wait_for_pidfile(self, retries: int = 10, delay: float = 0.1) -> None:
         if self._daemon_pid_path is None:
@@ -1,16 +1,20 @@
 import re
-import uuid
+import secrets
+from functools import lru_cache
 from typing import Any, Dict, List, Tuple
 
 from .tokens import (
     context_window_for_model,
+    PRIMING_TOKENS,
     estimate_message_tokens,
     estimate_messages_tokens,
     get_encoding,
+    messages_tokens_upper_bound,
     output_reserve_tokens,
 )
 
 
+CMD_SIGIL = "!"
 CMD_RE = re.compile(r"^!([\w-]+)(?:\s+(.*))?$")
 AGENT_NAMES = ("main", "meta")
 
@@ -30,10 +34,35 @@ def help_text() -> str:
     )
 
 
+def models_text(available_models: List[str]) -> str:
+    return "Available models:\n" + "\n".join(f"- {x}" for x in available_models)
+
+
+def static_command_responses(available_models: List[str]) -> Dict[str, str]:
+    # Commands whose reply depends only on configuration, never on room state.
+    help_msg = help_text()
+    return {"help": help_msg, "h": help_msg, "?": help_msg, "models": models_text(available_models)}
+
+
 State = Dict[str, Any]
 
 
 def parse_command(text: str) -> Tuple[str, str] | None:
+    if not text.startswith(CMD_SIGIL):
+        return None
+    # Commands repeat (!stop, !help, y/n flows); long arguments are parsed uncached so
+    # they do not evict the common ones.
+    if len(text) <= 64:
+        return _parse_short_command(text)
+    return _parse_command_text(text)
+
+
+@lru_cache(maxsize=256)
+def _parse_short_command(text: str) -> Tuple[str, str] | None:
+    return _parse_command_text(text)
+
+
+def _parse_command_text(text: str) -> Tuple[str, str] | None:
     m = CMD_RE.match(text)
     if not m:
         return None
@@ -60,7 +89,19 @@ def ensure_state(state: State, default_model: str) -> None:
         state["active_agent"] = "meta"
     _sync_active_agent_state(state)
     if "approvals" not in state:
-        state["approvals"] = {"shell": [], "dirs": [], "pending": None}
+        state["approvals"] = {"shell": set(), "dirs": set(), "pending": None}
+    approvals = state["approvals"]
+    approval_set(approvals, "shell")
+    approval_set(approvals, "dirs")
+
+
+def approval_set(approvals: Dict[str, Any], kind: str) -> set[str]:
+    # Older checkpoints (and callers seeding state) store approvals as lists.
+    entries = approvals.get(kind)
+    if not isinstance(entries, set):
+        entries = set(entries or ())
+        approvals[kind] = entries
+    return entries
 
 
 def set_active_agent(state: State, agent: str) -> None:
@@ -172,7 +213,7 @@ def handle_command(
     if cmd in {"help", "h", "?"}:
         return help_text()
     if cmd == "models":
-        return "Available models:\n" + "\n".join(f"- {x}" for x in available_models)
+        return models_text(available_models)
     if cmd == "model":
         if not arg:
             return "Usage: !model <name>\n" + "\n".join(available_models)
@@ -229,39 +270,55 @@ def remaining_context_percentage(state: State, default_model: str) -> str:
 
 
 def trim_messages(messages: List[Dict[str, Any]], model: str, max_turns: int) -> List[Dict[str, Any]]:
-    sys_msgs = [m for m in messages if m.get("role") == "system"]
-    other = [m for m in messages if m.get("role") != "system"]
-    keep = other[-(max_turns * 2):]
-    kept = sys_msgs + keep
+    sys_msgs: List[Dict[str, Any]] = []
+    other: List[Dict[str, Any]] = []
+    ordered = True
+    for m in messages:
+        if m.get("role") == "system":
+            sys_msgs.append(m)
+            ordered = ordered and not other
+        else:
+            other.append(m)
+    # Over the window, trim a block (not one turn at a time) so the history prefix
+    # stays identical for several turns and provider-side prompt caching can hit.
+    window = max_turns * 2
+    keep = other[-(window - window // 4):] if len(other) > window else other
+    # When nothing is dropped and system messages already lead, the input is the
+    # result; reuse it instead of building another copy of the window.
+    kept = messages if ordered and len(keep) == len(other) else sys_msgs + keep
 
     context_window = context_window_for_model(model)
     reserve = output_reserve_tokens(context_window)
     input_budget = max(0, context_window - reserve)
-
-    encoding = get_encoding(model)
-    if estimate_messages_tokens(kept, encoding) <= input_budget:
+    if messages_tokens_upper_bound(kept) <= input_budget:
         return kept
 
-    sys_msgs = [m for m in kept if m.get("role") == "system"]
-    other = [m for m in kept if m.get("role") != "system"]
-
+    # sys_msgs and keep already partition the window, so each message is estimated
+    # once and the budget check and the trim loops share these counts.
+    encoding = get_encoding(model)
     sys_counts = [estimate_message_tokens(m, encoding) for m in sys_msgs]
-    other_counts = [estimate_message_tokens(m, encoding) for m in other]
-    total = sum(sys_counts) + sum(other_counts)
+    keep_counts = [estimate_message_tokens(m, encoding) for m in keep]
+    total = sum(sys_counts) + sum(keep_counts) + PRIMING_TOKENS
+    if total <= input_budget:
+        return kept
 
-    while total > input_budget and other:
-        total -= other_counts.pop(0)
-        other.pop(0)
+    low_water = input_budget - input_budget // 10
+    drop_other = 0
+    while total > low_water and drop_other < len(keep):
+        total -= keep_counts[drop_other]
+        drop_other += 1
 
-    while total > input_budget and sys_msgs:
-        total -= sys_counts.pop(0)
-        sys_msgs.pop(0)
+    drop_sys = 0
+    while total > input_budget and drop_sys < len(sys_msgs):
+        total -= sys_counts[drop_sys]
+        drop_sys += 1
 
-    return sys_msgs + other
+    return sys_msgs[drop_sys:] + keep[drop_other:]
 
 
 def _new_conv_id() -> str:
-    return str(uuid.uuid4())[:8]
+    # Eight hex chars like before, without building a full UUID and its string form.
+    return secrets.token_hex(4)
 
 
 def _init_agent_state(default_model: str) -> Dict[str, Any]:
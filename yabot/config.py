@@ -28,6 +28,11 @@ class Config:
     daemon_port: int
     log_dir: str
     trace_path: str
+    tool_workers: int
+    matrix_coalesce_chars: int
+    state_flush_delay: float
+    max_concurrent_turns: int
+    matrix_edit_interval: float
 
 
 def load_config() -> Config:
@@ -44,6 +49,11 @@ def load_config() -> Config:
     daemon_url = os.environ.get("YABOT_DAEMON_URL")
     daemon_host = os.environ.get("YABOT_DAEMON_HOST", "127.0.0.1")
     daemon_port = int(os.environ.get("YABOT_DAEMON_PORT", "8765"))
+    tool_workers = int(os.environ.get("YABOT_TOOL_WORKERS", "16"))
+    matrix_coalesce_chars = int(os.environ.get("YABOT_MATRIX_COALESCE_CHARS", "512"))
+    state_flush_delay = float(os.environ.get("YABOT_STATE_FLUSH_DELAY", "0.5"))
+    max_concurrent_turns = int(os.environ.get("YABOT_MAX_CONCURRENT_TURNS", "8"))
+    matrix_edit_interval = float(os.environ.get("YABOT_MATRIX_EDIT_INTERVAL", "0.8"))
     log_dir = user_log_dir(bot_name)
     trace_path = os.environ.get("YABOT_TRACE_PATH", os.path.join(log_dir, "trace.jsonl"))
     os.makedirs(log_dir, exist_ok=True)
@@ -91,4 +101,9 @@ def load_config() -> Config:
         daemon_port=daemon_port,
         log_dir=log_dir,
         trace_path=trace_path,
+        tool_workers=tool_workers,
+        matrix_coalesce_chars=matrix_coalesce_chars,
+        state_flush_delay=state_flush_delay,
+        max_concurrent_turns=max_concurrent_turns,
+        matrix_edit_interval=matrix_edit_interval,
     )
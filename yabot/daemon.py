@@ -1,19 +1,22 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
 import os
-from typing import Any
+import signal
+from typing import Any, Callable
 from pathlib import Path
 
 import websockets
 from websockets.exceptions import ConnectionClosed
 
 from .config import load_config
+from .llm import close_shared_clients
 from .runtime import build_graph
 from .streams import StreamRegistry
 from .trace import TraceLogger
-from .ws_protocol import ClientMessage, ServerMessage, parse_json
+from .ws_protocol import ClientMessage, ServerMessage, parse_json, stream_frame_encoder
 
 
 class YabotDaemon:
@@ -74,39 +77,94 @@ class YabotDaemon:
         text = str(payload.get("text", ""))
         assert request_id, "request id is required"
         assert room_id, "room_id is required"
-        try:
-            async def on_token(chunk: str) -> None:
-                await websocket.send(
-                    ServerMessage(type="stream", id=request_id, room_id=room_id, chunk=chunk).to_json()
-                )
+        chunks = _ChunkSender(websocket, stream_frame_encoder(request_id, room_id))
 
-            async def run_graph() -> dict[str, Any]:
-                stream_fn = getattr(self.graph, "ainvoke_stream", None)
-                if callable(stream_fn):
-                    return await stream_fn(room_id, text, on_token=on_token)
-                return await self.graph.ainvoke(room_id, text)
+        async def run_graph() -> dict[str, Any]:
+            stream_fn = getattr(self.graph, "ainvoke_stream", None)
+            if callable(stream_fn):
+                return await stream_fn(room_id, text, on_token=chunks.push)
+            return await self.graph.ainvoke(room_id, text)
 
+        try:
             task = asyncio.create_task(run_graph())
             self.streams.register(room_id, task)
             try:
                 result = await task
             finally:
                 self.streams.clear(room_id, task)
+            await chunks.flush()
         except asyncio.CancelledError:
+            await chunks.settle(self.logger)
             await websocket.send(ServerMessage(type="cancelled", id=request_id, room_id=room_id).to_json())
+        except ConnectionClosed:
+            # Nobody is left to tell; sending an error frame would only fail again.
+            self.logger.info("Connection closed during request %s", request_id)
         except Exception as exc:
+            await chunks.settle(self.logger)
             await websocket.send(
                 ServerMessage(type="error", id=request_id, room_id=room_id, error=str(exc)).to_json()
             )
         else:
-            await websocket.send(
-                ServerMessage(type="response", id=request_id, room_id=room_id, result=result).to_json()
-            )
+            await _send_framed(websocket, ServerMessage(type="response", id=request_id, room_id=room_id, result=result))
+
+
+class _ChunkSender:
+    # Tokens are sent from a background task; whatever arrives while a send is in
+    # flight goes out as one merged stream frame, so bursts cost one frame instead of
+    # one per token and the model stream never waits on the socket.
+    def __init__(self, websocket: websockets.WebSocketServerProtocol, encode: Callable[[str], str]) -> None:
+        self._websocket = websocket
+        self._encode = encode
+        self._pending: list[str] = []
+        self._task: asyncio.Task[None] | None = None
+
+    async def push(self, chunk: str) -> None:
+        task = self._task
+        if task is not None and task.done():
+            # A failed send surfaces to the graph, as it did when tokens were sent inline.
+            task.result()
+            task = None
+        self._pending.append(chunk)
+        if task is None:
+            self._task = asyncio.create_task(self._drain())
+
+    async def flush(self) -> None:
+        if self._task is not None:
+            await self._task
+
+    async def settle(self, logger: logging.Logger) -> None:
+        # Used while another outcome is being reported: tokens already queued still go
+        # out first, but a failed send is only logged so it cannot replace that outcome.
+        try:
+            await self.flush()
+        except Exception as exc:
+            logger.info("Dropped stream tokens: %s", exc)
+
+    async def _drain(self) -> None:
+        while self._pending:
+            text = "".join(self._pending)
+            self._pending.clear()
+            await self._websocket.send(self._encode(text))
+
+
+async def _send_framed(websocket: websockets.WebSocketServerProtocol, message: ServerMessage) -> None:
+    # Small responses go out as one frame; large ones as a fragmented message, which
+    # the client's recv() reassembles, so the whole JSON text is never built at once.
+    frames = message.iter_json()
+    first = next(frames)
+    second = next(frames, None)
+    if second is None:
+        await websocket.send(first)
+        return
+    await websocket.send(itertools.chain((first, second), frames))
 
 
 async def serve(host: str, port: int, graph: Any, parent_pid: int | None = None) -> None:
     daemon = YabotDaemon(graph)
     shutdown_event = asyncio.Event()
+    # The CLI stops an autostarted daemon with SIGTERM; exiting through the event lets
+    # the debounced checkpoint below be written (atexit does not run on a signal).
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, shutdown_event.set)
     monitor_task: asyncio.Task[None] | None = None
     if parent_pid is not None:
         monitor_task = asyncio.create_task(_monitor_parent(parent_pid, shutdown_event))
@@ -114,6 +172,10 @@ async def serve(host: str, port: int, graph: Any, parent_pid: int | None = None)
         await shutdown_event.wait()
     if monitor_task is not None:
         monitor_task.cancel()
+    flush_state = getattr(getattr(graph, "checkpointer", None), "flush", None)
+    if flush_state is not None:
+        flush_state()
+    await close_shared_clients()
 
 
 def run() -> None:
@@ -1,11 +1,15 @@
 import asyncio
-import contextvars
 import json
 import uuid
 import os
+import re
+import weakref
+from contextlib import nullcontext
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, TypedDict
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, StateGraph
 
@@ -15,10 +19,12 @@ from .commands import (
     agent_recent_tool_calls,
     agent_record_tool_calls,
     agent_set_model,
+    approval_set,
     ensure_state,
     handle_command,
     parse_command,
     room_active_conv,
+    static_command_responses,
     trim_messages,
 )
 from .llm import LLMClient
@@ -27,6 +33,37 @@ from .tools import TOOLS
 from .tools.registry import execute_tool_async
 
 
+# Non-blank paragraphs separated by blank lines; avoids materialising every split("\n\n") piece.
+PARAGRAPH_RE = re.compile(r"[^\s](?:[^\n]|\n(?!\n))*")
+APPROVAL_EXEMPT_TOOLS = frozenset({"ask_user", "agent_ask", "agent_set_model", "agent_recent_tool_calls"})
+DIR_SCOPED_TOOLS = frozenset({"list_dir", "read_file", "write_file", "create_dir"})
+# File tools whose approval scope is the parent directory of their path.
+FILE_PATH_TOOLS = frozenset({"read_file", "write_file"})
+KNOWN_TOOLS = APPROVAL_EXEMPT_TOOLS | DIR_SCOPED_TOOLS | {"get_skills_dir", "run_shell"}
+READ_ONLY_TOOLS = frozenset({"list_dir", "read_file", "get_skills_dir"})
+# Tools that neither touch the filesystem nor run another agent turn.
+SIDE_EFFECT_FREE_TOOLS = frozenset({"agent_set_model", "agent_recent_tool_calls"})
+
+
+ParsedArgs = tuple[Any, str | None]
+
+
+def _parse_tool_arguments(raw_args: str, cache: dict[str, ParsedArgs] | None = None) -> ParsedArgs:
+    # Approval checks, AGENTS.md lookup and execution all read the same arguments
+    # string within a turn; a turn-local cache lets them share one parse (callers
+    # must treat the value as read-only) without pinning arguments past the turn.
+    if cache is not None:
+        cached = cache.get(raw_args)
+        if cached is not None:
+            return cached
+    try:
+        parsed: ParsedArgs = (json.loads(raw_args), None)
+    except json.JSONDecodeError as exc:
+        parsed = (None, str(exc))
+    if cache is not None:
+        cache[raw_args] = parsed
+    return parsed
+
 class GraphState(TypedDict, total=False):
     incoming: str
     responses: List[str]
@@ -60,25 +97,25 @@ class YabotGraph:
         self.llm = llm
         self.default_model = default_model
         self.available_models = list(available_models)
+        self._static_command_responses = static_command_responses(self.available_models)
         self.max_turns = max_turns
         self.skills = skills
         self.base_tools = list(TOOLS)
         self.skill_tools = skills.tool_defs()
+        # Tool payloads are read-only once built; every LLM call reuses the same lists.
+        self._main_tools = self.base_tools + self.skill_tools
+        self._meta_tools = list(META_AGENT_TOOLS)
         self.checkpointer = checkpointer or MemorySaver()
         self.tracer = tracer
         self.system_prompt = system_prompt
         self.meta_system_prompt = meta_system_prompt
-        self._stream_callback: contextvars.ContextVar = contextvars.ContextVar("yabot_stream_callback", default=None)
+        # Turns for one room run one at a time; other rooms are never blocked. Weak values
+        # drop a room's lock once no turn holds or waits on it, so idle rooms cost nothing.
+        self._room_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
         self.graph = self._build_graph()
 
     async def ainvoke(self, room_id: str, text: str) -> Dict[str, Any]:
-        trace_ctx = {"trace_id": uuid.uuid4().hex, "room_id": room_id}
-        if self.tracer:
-            self.tracer.log("invoke", {"text": text}, context=trace_ctx)
-        return await self.graph.ainvoke(
-            {"incoming": text, "trace": trace_ctx},
-            config={"configurable": {"thread_id": room_id}},
-        )
+        return await self._invoke_graph(room_id, text, None)
 
     async def ainvoke_stream(
         self,
@@ -86,11 +123,50 @@ class YabotGraph:
         text: str,
         on_token: Any,
     ) -> Dict[str, Any]:
-        token = self._stream_callback.set(on_token)
+        return await self._invoke_graph(room_id, text, on_token)
+
+    async def ainvoke_batch(
+        self,
+        items: List[tuple[str, str]],
+        *,
+        concurrency: int = 8,
+    ) -> List[Dict[str, Any]]:
+        assert concurrency > 0, "concurrency must be positive"
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def invoke_one(room_id: str, text: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.ainvoke(room_id, text)
+
+        return list(await asyncio.gather(*(invoke_one(room_id, text) for room_id, text in items)))
+
+    async def _invoke_graph(self, room_id: str, text: str, on_token: Any) -> Dict[str, Any]:
+        trace_ctx = {"trace_id": uuid.uuid4().hex, "room_id": room_id}
+        if self.tracer:
+            self.tracer.log("invoke", {"text": text}, context=trace_ctx)
+        # The stream callback rides on the per-run config (not the checkpointed state),
+        # so concurrent rooms each get their own callback without a shared ContextVar.
+        configurable: Dict[str, Any] = {"thread_id": room_id}
+        if on_token is not None:
+            configurable["on_token"] = on_token
+        deferred_writes = getattr(self.checkpointer, "deferred_writes", None)
+        lock = self._room_locks.get(room_id)
+        if lock is None:
+            lock = self._room_locks[room_id] = asyncio.Lock()
         try:
-            return await self.ainvoke(room_id, text)
+            async with lock:
+                with deferred_writes() if deferred_writes else nullcontext():
+                    return await self.graph.ainvoke(
+                        {"incoming": text, "trace": trace_ctx},
+                        config={"configurable": configurable},
+                    )
         finally:
-            self._stream_callback.reset(token)
+            if self.tracer:
+                await asyncio.to_thread(self.tracer.flush)
+
+    @staticmethod
+    def _stream_callback(config: RunnableConfig | None) -> Any:
+        return ((config or {}).get("configurable") or {}).get("on_token")
 
     def _build_graph(self):
         builder: StateGraph = StateGraph(GraphState)
@@ -134,8 +210,14 @@ class YabotGraph:
         if not system_prompt:
             return
         messages = conv.get("messages", [])
+        if conv.get("_system_prompt_installed") and messages:
+            # The flag only holds while the prompt still leads the conversation;
+            # trimming or a prompt change falls through to the full scan.
+            head = messages[0]
+            if head.get("role") == "system" and head.get("content") == system_prompt:
+                return
         target = system_prompt.strip()
-        legacy_prompts = {prompt.strip() for prompt in self._legacy_system_prompts()}
+        legacy_prompts = self._legacy_system_prompts()
         updated: List[dict[str, Any]] = []
         found = False
         for msg in messages:
@@ -157,9 +239,12 @@ class YabotGraph:
         if not found:
             updated = [{"role": "system", "content": system_prompt}] + updated
         conv["messages"] = updated
+        conv["_system_prompt_installed"] = True
 
     @staticmethod
-    def _legacy_system_prompts() -> set[str]:
+    @lru_cache(maxsize=1)
+    def _legacy_system_prompts() -> frozenset[str]:
+        # Constant text; built and normalised once per process, not on every prompt check.
         legacy_main = "\n".join(
             [
                 "You are Yabot, a coding-first assistant.",
@@ -179,7 +264,7 @@ class YabotGraph:
                 "Be concise and precise. Ask clarifying questions only when needed.",
             ]
         )
-        return {legacy_main, legacy_meta}
+        return frozenset({legacy_main.strip(), legacy_meta.strip()})
 
     def _system_prompt_for_agent(self, agent_name: str) -> str | None:
         if agent_name == "meta":
@@ -188,18 +273,18 @@ class YabotGraph:
 
     def _tools_for_agent(self, agent_name: str) -> List[dict[str, Any]]:
         if agent_name == "meta":
-            return list(META_AGENT_TOOLS)
-        return self.base_tools + self.skill_tools
+            return self._meta_tools
+        return self._main_tools
 
     def _tool_calls_to_dicts(self, tool_calls: Any) -> List[dict[str, Any]]:
         normalized: List[dict[str, Any]] = []
         for call in tool_calls or []:
-            if hasattr(call, "model_dump"):
-                data = call.model_dump()
-            elif isinstance(call, dict):
+            fn = getattr(call, "function", None)
+            if isinstance(call, dict):
                 data = dict(call)
-            else:
-                fn = getattr(call, "function", None)
+            elif fn is not None:
+                # Only id, type and function name/arguments are used downstream, so
+                # plain attribute reads beat a full pydantic model_dump per call.
                 data = {
                     "id": getattr(call, "id", ""),
                     "function": {
@@ -207,6 +292,16 @@ class YabotGraph:
                         "arguments": getattr(fn, "arguments", "{}"),
                     },
                 }
+                call_type = getattr(call, "type", None)
+                if isinstance(call_type, str):
+                    data["type"] = call_type
+            elif hasattr(call, "model_dump"):
+                try:
+                    data = call.model_dump(mode="python", exclude_none=True)
+                except TypeError:
+                    data = call.model_dump()
+            else:
+                data = {"id": getattr(call, "id", ""), "function": {}}
             if "type" not in data:
                 data["type"] = "function"
             name = (data.get("function") or {}).get("name", "")
@@ -287,6 +382,7 @@ class YabotGraph:
         agent_name: str,
         tools: List[dict[str, Any]],
         start_index: int | None = None,
+        stream_callback: Any = None,
     ) -> tuple[List[str], dict[str, Any] | None]:
         steps = list(state.get("plan_steps") or [])
         if not steps:
@@ -294,7 +390,8 @@ class YabotGraph:
         index = start_index if start_index is not None else int(state.get("plan_index", 0))
         total = len(steps)
         responses: List[str] = []
-        stream_callback = self._stream_callback.get()
+        # Steps of one plan tend to repeat the same tool calls; share what has been cleared.
+        approved_calls: set[tuple[str, str]] = set()
 
         while index < total:
             step = steps[index]
@@ -316,6 +413,8 @@ class YabotGraph:
                 agents_loaded,
                 agent_name,
                 tools,
+                stream_callback=stream_callback,
+                approved_calls=approved_calls,
             )
             if tool_notices:
                 responses.extend(tool_notices)
@@ -450,15 +549,17 @@ class YabotGraph:
             injected.append(msg)
         return injected
 
-    def _agents_paths_for_tool_calls(self, tool_calls: List[dict[str, Any]]) -> List[Path]:
+    def _agents_paths_for_tool_calls(
+        self,
+        tool_calls: List[dict[str, Any]],
+        arg_cache: dict[str, ParsedArgs] | None = None,
+    ) -> List[Path]:
         paths: List[Path] = []
         for call in tool_calls:
             function = call.get("function") or {}
             name = function.get("name") or ""
-            raw_args = function.get("arguments") or "{}"
-            try:
-                args = json.loads(raw_args)
-            except json.JSONDecodeError:
+            args, error = _parse_tool_arguments(function.get("arguments") or "{}", arg_cache)
+            if error:
                 continue
 
             if name == "run_shell":
@@ -467,7 +568,7 @@ class YabotGraph:
                     paths.append(Path(workdir))
                 continue
 
-            if name in {"list_dir", "read_file", "write_file", "create_dir"}:
+            if name in DIR_SCOPED_TOOLS:
                 required_dir = self._required_dir_for_tool(name, args)
                 if required_dir:
                     paths.append(required_dir)
@@ -479,7 +580,7 @@ class YabotGraph:
         if not isinstance(path, str) or not path:
             return None
         target = Path(path).expanduser().resolve(strict=False)
-        if name in {"read_file", "write_file"}:
+        if name in FILE_PATH_TOOLS:
             return target.parent
         return target
 
@@ -498,48 +599,53 @@ class YabotGraph:
         return f"{command}\n{workdir or ''}"
 
     def _is_shell_approved(self, state: Dict[str, Any], command: str, workdir: Optional[str]) -> bool:
-        approvals = state["approvals"]
-        return self._shell_key(command, workdir) in approvals.get("shell", [])
+        return self._shell_key(command, workdir) in approval_set(state["approvals"], "shell")
 
     def _approve_shell(self, state: Dict[str, Any], command: str, workdir: Optional[str]) -> None:
-        approvals = state["approvals"]
-        shell_list = approvals.setdefault("shell", [])
-        key = self._shell_key(command, workdir)
-        if key not in shell_list:
-            shell_list.append(key)
+        approval_set(state["approvals"], "shell").add(self._shell_key(command, workdir))
 
     def _is_dir_approved(self, state: Dict[str, Any], path: str) -> bool:
-        approvals = state["approvals"]
-        dir_list = approvals.get("dirs", [])
-        target = Path(path).expanduser().resolve(strict=False)
-        for approved in dir_list:
-            approved_path = Path(approved).expanduser().resolve(strict=False)
-            if target == approved_path or target.is_relative_to(approved_path):
-                return True
-        return False
+        return self._is_resolved_dir_approved(state, Path(path).expanduser().resolve(strict=False))
+
+    def _is_resolved_dir_approved(self, state: Dict[str, Any], target: Path) -> bool:
+        approved = approval_set(state["approvals"], "dirs")
+        if not approved:
+            return False
+        # Approved dirs are stored resolved by _approve_dir, so walking the target's
+        # ancestors turns each check into set lookups instead of a scan of resolves.
+        if str(target) in approved:
+            return True
+        return any(str(parent) in approved for parent in target.parents)
 
     def _approve_dir(self, state: Dict[str, Any], path: str) -> None:
-        approvals = state["approvals"]
-        dir_list = approvals.setdefault("dirs", [])
-        normalized = str(Path(path).expanduser().resolve(strict=False))
-        if normalized not in dir_list:
-            dir_list.append(normalized)
+        target = Path(path).expanduser().resolve(strict=False)
+        if self._is_resolved_dir_approved(state, target):
+            return
+        # Keep only the outermost approvals; entries under the new dir are now redundant.
+        approved = approval_set(state["approvals"], "dirs")
+        approved.difference_update([entry for entry in approved if Path(entry).is_relative_to(target)])
+        approved.add(str(target))
 
-    def _first_missing_approval(self, state: Dict[str, Any], tool_calls: List[dict[str, Any]]) -> dict[str, Any] | None:
+    def _first_missing_approval(
+        self,
+        state: Dict[str, Any],
+        tool_calls: List[dict[str, Any]],
+        approved_calls: set[tuple[str, str]] | None = None,
+        arg_cache: dict[str, ParsedArgs] | None = None,
+    ) -> dict[str, Any] | None:
+        # approved_calls remembers (name, arguments) pairs that already passed within
+        # one loop; approvals only grow during a turn, so they cannot start failing.
         for call in tool_calls:
             function = call.get("function") or {}
             name = function.get("name") or ""
-            if self.skills.is_skill_tool(name) or name in {
-                "ask_user",
-                "agent_ask",
-                "agent_set_model",
-                "agent_recent_tool_calls",
-            }:
+            if self.skills.is_skill_tool(name) or name in APPROVAL_EXEMPT_TOOLS:
                 continue
             raw_args = function.get("arguments") or "{}"
-            try:
-                args = json.loads(raw_args)
-            except json.JSONDecodeError:
+            signature = (name, raw_args)
+            if approved_calls is not None and signature in approved_calls:
+                continue
+            args, error = _parse_tool_arguments(raw_args, arg_cache)
+            if error:
                 args = {}
 
             if name == "run_shell":
@@ -548,11 +654,13 @@ class YabotGraph:
                 if not self._is_shell_approved(state, command, workdir):
                     return {"kind": "shell", "command": command, "workdir": workdir}
 
-            if name in {"list_dir", "read_file", "write_file", "create_dir"}:
+            if name in DIR_SCOPED_TOOLS:
                 required_dir = self._required_dir_for_tool(name, args)
-                if required_dir and not self._is_dir_approved(state, str(required_dir)):
+                if required_dir and not self._is_resolved_dir_approved(state, required_dir):
                     return {"kind": "dir", "dir": str(required_dir)}
 
+            if approved_calls is not None:
+                approved_calls.add(signature)
         return None
 
     async def _execute_tool_calls(
@@ -561,117 +669,150 @@ class YabotGraph:
         agent_name: str,
         tool_calls: List[dict[str, Any]],
         trace_ctx: dict[str, Any],
-    ) -> tuple[List[dict[str, Any]], List[dict[str, Any]], List[str]]:
-        tool_messages: List[dict[str, Any]] = []
+        new_messages: List[dict[str, Any]],
+        working_messages: List[dict[str, Any]],
+        arg_cache: dict[str, ParsedArgs] | None = None,
+    ) -> List[str]:
+        # Tool messages are appended in place so they directly follow the assistant
+        # tool_calls message; skill system messages go after the whole tool block.
         system_messages: List[dict[str, Any]] = []
         result_notices: List[str] = []
-        for call in tool_calls:
-            function = call.get("function") or {}
-            name = function.get("name") or ""
-            assert name, "tool call missing name"
-            assert self.skills.is_skill_tool(name) or name in {
-                "ask_user",
-                "agent_ask",
-                "agent_set_model",
-                "agent_recent_tool_calls",
-                "list_dir",
-                "read_file",
-                "write_file",
-                "create_dir",
-                "get_skills_dir",
-                "run_shell",
-            }, f"unknown tool: {name}"
-            raw_args = function.get("arguments") or "{}"
-            try:
-                arguments = json.loads(raw_args)
-            except json.JSONDecodeError as exc:
-                arguments = {}
-                result = f"ERROR: invalid JSON arguments: {exc}"
-            else:
-                if self.skills.is_skill_tool(name):
-                    skill = self.skills.get_by_tool_name(name)
-                    if skill:
-                        system_messages.append({"role": "system", "content": skill.content})
-                        result = f"Skill applied: {skill.name}"
-                    else:
-                        result = f"ERROR: unknown skill tool {name}"
-                elif name == "agent_set_model":
-                    target = str(arguments.get("agent", "main")).strip().lower()
-                    model = str(arguments.get("model", "")).strip()
-                    if not target or not model:
-                        result = "ERROR: agent and model are required"
-                    else:
-                        updated = agent_set_model(state, target, model, self.available_models)
-                        result = (
-                            f"Model set to `{model}` for `{target}`."
-                            if updated
-                            else f"ERROR: unknown model `{model}` or agent `{target}`"
-                        )
+        prefetched: Dict[int, asyncio.Task[str]] = {}
+        try:
+            for index, call in enumerate(tool_calls):
+                function = call.get("function") or {}
+                name = function.get("name") or ""
+                assert name, "tool call missing name"
+                if index not in prefetched and name in READ_ONLY_TOOLS:
+                    prefetched.update(self._prefetch_read_only_tools(tool_calls, index, arg_cache))
+                assert self.skills.is_skill_tool(name) or name in KNOWN_TOOLS, f"unknown tool: {name}"
+                raw_args = function.get("arguments") or "{}"
+                arguments, error = _parse_tool_arguments(raw_args, arg_cache)
+                if error:
+                    arguments = {}
+                    result = f"ERROR: invalid JSON arguments: {error}"
+                else:
+                    if self.skills.is_skill_tool(name):
+                        skill = self.skills.get_by_tool_name(name)
+                        if skill:
+                            system_messages.append({"role": "system", "content": skill.content})
+                            result = f"Skill applied: {skill.name}"
+                        else:
+                            result = f"ERROR: unknown skill tool {name}"
+                    elif name == "agent_set_model":
+                        target = str(arguments.get("agent", "main")).strip().lower()
+                        model = str(arguments.get("model", "")).strip()
+                        if not target or not model:
+                            result = "ERROR: agent and model are required"
+                        else:
+                            updated = agent_set_model(state, target, model, self.available_models)
+                            result = (
+                                f"Model set to `{model}` for `{target}`."
+                                if updated
+                                else f"ERROR: unknown model `{model}` or agent `{target}`"
+                            )
+                            if self.tracer:
+                                self.tracer.log(
+                                    "agent_set_model",
+                                    {"agent": target, "model": model, "ok": updated},
+                                    context=trace_ctx,
+                                )
+                    elif name == "agent_recent_tool_calls":
+                        target = str(arguments.get("agent", "main")).strip().lower()
+                        try:
+                            limit = int(arguments.get("limit", 10) or 10)
+                        except (TypeError, ValueError):
+                            limit = 10
+                        history = agent_recent_tool_calls(state, target, limit=limit)
+                        result = json.dumps(history)
                         if self.tracer:
                             self.tracer.log(
-                                "agent_set_model",
-                                {"agent": target, "model": model, "ok": updated},
+                                "agent_recent_tool_calls",
+                                {"agent": target, "count": len(history)},
                                 context=trace_ctx,
                             )
-                elif name == "agent_recent_tool_calls":
-                    target = str(arguments.get("agent", "main")).strip().lower()
-                    try:
-                        limit = int(arguments.get("limit", 10) or 10)
-                    except (TypeError, ValueError):
-                        limit = 10
-                    history = agent_recent_tool_calls(state, target, limit=limit)
-                    result = json.dumps(history)
+                    elif name == "agent_ask":
+                        target = str(arguments.get("agent", "main")).strip().lower()
+                        text = str(arguments.get("text", "")).strip()
+                        if not text:
+                            result = "ERROR: text is required"
+                        else:
+                            result = await self._agent_ask(state, target, text, trace_ctx)
+                    elif index in prefetched:
+                        result = await prefetched[index]
+                    else:
+                        result = await execute_tool_async(name, arguments)
+                    if name == "run_shell":
+                        try:
+                            payload = json.loads(result)
+                        except json.JSONDecodeError:
+                            payload = {}
+                        if payload.get("error"):
+                            result_notices.append(f"[system] Shell error: {payload['error']}")
+                        else:
+                            returncode = payload.get("returncode")
+                            stderr = (payload.get("stderr") or "").strip()
+                            stdout = (payload.get("stdout") or "").strip()
+                            if isinstance(returncode, int) and returncode != 0:
+                                detail = stderr or stdout or "no output"
+                                result_notices.append(
+                                    f"[system] Shell command failed (exit {returncode}): {detail}"
+                                )
                     if self.tracer:
                         self.tracer.log(
-                            "agent_recent_tool_calls",
-                            {"agent": target, "count": len(history)},
+                            "tool_result",
+                            {
+                                "tool": name,
+                                "tool_call_id": call.get("id", ""),
+                                "raw_arguments": raw_args,
+                                "arguments": arguments,
+                                "result": result,
+                            },
                             context=trace_ctx,
                         )
-                elif name == "agent_ask":
-                    target = str(arguments.get("agent", "main")).strip().lower()
-                    text = str(arguments.get("text", "")).strip()
-                    if not text:
-                        result = "ERROR: text is required"
-                    else:
-                        result = await self._agent_ask(state, target, text, trace_ctx)
-                else:
-                    result = await execute_tool_async(name, arguments)
-                if name == "run_shell":
-                    try:
-                        payload = json.loads(result)
-                    except json.JSONDecodeError:
-                        payload = {}
-                    if payload.get("error"):
-                        result_notices.append(f"[system] Shell error: {payload['error']}")
-                    else:
-                        returncode = payload.get("returncode")
-                        stderr = (payload.get("stderr") or "").strip()
-                        stdout = (payload.get("stdout") or "").strip()
-                        if isinstance(returncode, int) and returncode != 0:
-                            detail = stderr or stdout or "no output"
-                            result_notices.append(
-                                f"[system] Shell command failed (exit {returncode}): {detail}"
-                            )
-                if self.tracer:
-                    self.tracer.log(
-                        "tool_result",
-                        {
-                            "tool": name,
-                            "tool_call_id": call.get("id", ""),
-                            "raw_arguments": raw_args,
-                            "arguments": arguments,
-                            "result": result,
-                        },
-                        context=trace_ctx,
-                    )
-            tool_messages.append(
-                {
+                tool_message = {
                     "role": "tool",
                     "tool_call_id": call.get("id", ""),
                     "content": result,
                 }
-            )
-        return tool_messages, system_messages, result_notices
+                new_messages.append(tool_message)
+                working_messages.append(tool_message)
+        finally:
+            # A failed assert, agent_ask error or stop can leave prefetched reads
+            # unawaited; cancel them and collect their results so none is orphaned.
+            if prefetched:
+                for task in prefetched.values():
+                    task.cancel()
+                await asyncio.gather(*prefetched.values(), return_exceptions=True)
+        if system_messages:
+            new_messages.extend(system_messages)
+            working_messages.extend(system_messages)
+        return result_notices
+
+    def _prefetch_read_only_tools(
+        self,
+        tool_calls: List[dict[str, Any]],
+        start: int = 0,
+        arg_cache: dict[str, ParsedArgs] | None = None,
+    ) -> Dict[int, asyncio.Task[str]]:
+        # Reads in a run starting at `start` cannot observe a write, shell command or
+        # delegated agent turn from later in the batch, and every earlier call has
+        # already finished, so the whole run can execute at once.
+        reads: List[tuple[int, str, dict[str, Any]]] = []
+        for index in range(start, len(tool_calls)):
+            function = tool_calls[index].get("function") or {}
+            name = function.get("name") or ""
+            if self.skills.is_skill_tool(name) or name in SIDE_EFFECT_FREE_TOOLS:
+                continue
+            if name not in READ_ONLY_TOOLS:
+                break
+            arguments, error = _parse_tool_arguments(function.get("arguments") or "{}", arg_cache)
+            if error:
+                continue
+            reads.append((index, name, arguments))
+        if len(reads) < 2:
+            return {}
+        return {index: asyncio.create_task(execute_tool_async(name, arguments)) for index, name, arguments in reads}
 
     # shell execution lives in tools.run_shell and is dispatched via execute_tool_async
 
@@ -725,12 +866,23 @@ class YabotGraph:
         tools: List[dict[str, Any]],
         initial_tool_calls: List[dict[str, Any]] | None = None,
         initial_assistant: dict[str, Any] | None = None,
+        stream_callback: Any = None,
+        lead_messages: List[dict[str, Any]] | None = None,
+        approved_calls: set[tuple[str, str]] | None = None,
     ) -> tuple[List[str], List[dict[str, Any]] | None, dict[str, Any] | None, List[str]]:
+        # lead_messages continue the conversation ahead of this turn (e.g. an ask_user
+        # answer) and are returned in new_messages, so callers need not copy history.
         working_messages = list(messages)
         new_messages: List[dict[str, Any]] = []
+        if lead_messages:
+            working_messages.extend(lead_messages)
+            new_messages.extend(lead_messages)
         tool_notices: List[str] = []
         tool_calls = initial_tool_calls
         assistant_message = initial_assistant
+        if approved_calls is None:
+            approved_calls = set()
+        arg_cache: dict[str, ParsedArgs] = {}
 
         if tool_calls is not None:
             if assistant_message is None:
@@ -750,7 +902,6 @@ class YabotGraph:
                         },
                         context=trace_ctx,
                     )
-                stream_callback = self._stream_callback.get()
                 safe_messages = self._normalize_messages_for_llm(working_messages)
                 if stream_callback:
                     message = await self.llm.create_message_stream(
@@ -786,10 +937,8 @@ class YabotGraph:
                     function = call.get("function") or {}
                     name = function.get("name") or ""
                     if name == "ask_user":
-                        raw_args = function.get("arguments") or "{}"
-                        try:
-                            args = json.loads(raw_args)
-                        except json.JSONDecodeError:
+                        args, error = _parse_tool_arguments(function.get("arguments") or "{}", arg_cache)
+                        if error:
                             args = {}
                         question = str(args.get("question", "")).strip() or "Can you clarify?"
                         return [question], None, {
@@ -798,9 +947,8 @@ class YabotGraph:
                             "agent": agent_name,
                         }, tool_notices
 
-                missing = self._first_missing_approval(state, tool_calls)
+                missing = self._first_missing_approval(state, tool_calls, approved_calls, arg_cache)
                 if missing:
-                    stream_callback = self._stream_callback.get()
                     prompt = self._approval_prompt(missing)
                     if stream_callback:
                         await stream_callback(prompt + "\n")
@@ -813,30 +961,23 @@ class YabotGraph:
                         "agent": agent_name,
                     }, tool_notices
 
-                agent_paths = self._agents_paths_for_tool_calls(tool_calls)
+                agent_paths = self._agents_paths_for_tool_calls(tool_calls, arg_cache)
                 if agent_paths:
                     injected = self._inject_agents_messages(agents_loaded, working_messages, agent_paths)
                     if injected:
                         new_messages.extend(injected)
 
-                tool_messages, system_messages, result_notices = await self._execute_tool_calls(
-                    state, agent_name, tool_calls, trace_ctx
+                result_notices = await self._execute_tool_calls(
+                    state, agent_name, tool_calls, trace_ctx, new_messages, working_messages, arg_cache
                 )
-                new_messages.extend(tool_messages)
-                working_messages.extend(tool_messages)
-                if system_messages:
-                    new_messages.extend(system_messages)
-                    working_messages.extend(system_messages)
                 if result_notices:
                     tool_notices.extend(result_notices)
                 tool_calls = None
                 continue
 
-            final_text = (working_messages[-1].get("content") or "").strip()
-            if final_text:
-                responses = [p.strip() for p in final_text.split("\n\n") if p.strip()]
-            else:
-                responses = ["…(no output)"]
+            # PARAGRAPH_RE skips surrounding whitespace itself, so the reply is scanned once.
+            final_text = working_messages[-1].get("content") or ""
+            responses = [m.group(0).rstrip() for m in PARAGRAPH_RE.finditer(final_text)] or ["…(no output)"]
             if self.tracer:
                 self.tracer.log("response_final", {"responses": responses}, context=trace_ctx)
             return responses, new_messages, None, tool_notices
@@ -864,7 +1005,8 @@ class YabotGraph:
         conv_id, conv = room_active_conv(state)
         model = conv.get("model", self.default_model)
         agents_loaded = conv.setdefault("agents_loaded", [])
-        self._ensure_system_prompt(conv, self._system_prompt_for_agent(active_agent))
+        # _refresh_system_prompts already covered the active conversation: after
+        # ensure_state, state["conversations"] is the active agent's mapping.
         conv_messages = conv.get("messages", [])
         self._inject_agents_messages(agents_loaded, conv_messages, [Path(os.getcwd())])
         conv["messages"] = conv_messages
@@ -874,7 +1016,7 @@ class YabotGraph:
             self.tracer.log("incoming", {"text": incoming}, context=trace_ctx)
 
         state["command"] = {}
-        if state.get("approvals", {}).get("pending"):
+        if state["approvals"].get("pending"):
             state["route"] = "pending"
             return state
 
@@ -899,8 +1041,9 @@ class YabotGraph:
                 if isinstance(conv, dict):
                     self._ensure_system_prompt(conv, prompt)
 
-    async def _handle_pending(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_pending(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
         incoming = (state.get("incoming") or "").strip()
+        stream_callback = self._stream_callback(config)
         responses: List[str] = []
         active_agent = state.get("active_agent", "meta")
 
@@ -933,28 +1076,24 @@ class YabotGraph:
                 "content": incoming,
             }
             state["approvals"]["pending"] = None
-            base_messages = list(conv.get("messages", []))
-            if assistant_message:
-                base_messages.append(assistant_message)
-            base_messages.append(tool_message)
+            lead_messages = [assistant_message, tool_message] if assistant_message else [tool_message]
             responses, new_messages, pending_next, tool_notices = await self._run_llm_loop(
                 state,
                 model,
-                base_messages,
+                conv.get("messages", []),
                 pending_trace,
                 agents_loaded,
                 pending_agent,
                 pending_tools,
+                stream_callback=stream_callback,
+                lead_messages=lead_messages,
             )
             if tool_notices:
                 responses = tool_notices + responses
             if pending_next:
                 state["approvals"]["pending"] = pending_next
             elif new_messages is not None:
-                conv_messages = list(conv.get("messages", []))
-                if assistant_message:
-                    conv_messages.append(assistant_message)
-                conv_messages.append(tool_message)
+                conv_messages = conv.get("messages", [])
                 conv_messages.extend(new_messages)
                 conv["messages"] = trim_messages(conv_messages, model, self.max_turns)
         elif incoming.strip().lower() == "y":
@@ -976,6 +1115,7 @@ class YabotGraph:
                 pending_tools,
                 initial_tool_calls=pending.get("tool_calls"),
                 initial_assistant=pending.get("assistant"),
+                stream_callback=stream_callback,
             )
             if tool_notices:
                 responses = tool_notices + responses
@@ -993,12 +1133,11 @@ class YabotGraph:
                     context=pending_trace,
                 )
             state["approvals"]["pending"] = None
-            base_messages = list(conv.get("messages", []))
-            assistant_message = pending.get("assistant")
-            stripped = self._assistant_without_tool_calls(assistant_message)
+            lead_messages = []
+            stripped = self._assistant_without_tool_calls(pending.get("assistant"))
             if stripped:
-                base_messages.append(stripped)
-            base_messages.append(
+                lead_messages.append(stripped)
+            lead_messages.append(
                 {
                     "role": "user",
                     "content": f"Approval denied. Feedback: {incoming}",
@@ -1007,22 +1146,20 @@ class YabotGraph:
             responses, new_messages, pending_next, tool_notices = await self._run_llm_loop(
                 state,
                 model,
-                base_messages,
+                conv.get("messages", []),
                 pending_trace,
                 agents_loaded,
                 pending_agent,
                 pending_tools,
+                stream_callback=stream_callback,
+                lead_messages=lead_messages,
             )
             if tool_notices:
                 responses = tool_notices + responses
             if pending_next:
                 state["approvals"]["pending"] = pending_next
             elif new_messages is not None:
-                conv_messages = list(conv.get("messages", []))
-                stripped = self._assistant_without_tool_calls(assistant_message)
-                if stripped:
-                    conv_messages.append(stripped)
-                conv_messages.append(base_messages[-1])
+                conv_messages = conv.get("messages", [])
                 conv_messages.extend(new_messages)
                 conv["messages"] = trim_messages(conv_messages, model, self.max_turns)
 
@@ -1037,6 +1174,7 @@ class YabotGraph:
                 agents_loaded,
                 pending_agent,
                 pending_tools,
+                stream_callback=stream_callback,
             )
             responses.extend(follow_responses)
             if follow_pending:
@@ -1057,7 +1195,10 @@ class YabotGraph:
         if self.tracer:
             self.tracer.log("command", {"command": cmd, "arg": arg}, context=trace_ctx)
         before_agent = active_agent
-        responses = [handle_command(state, cmd, arg, self.available_models, self.default_model)]
+        response = self._static_command_responses.get(cmd)
+        if response is None:
+            response = handle_command(state, cmd, arg, self.available_models, self.default_model)
+        responses = [response]
         state["plan"] = []
         state["plan_steps"] = []
         state["plan_index"] = 0
@@ -1073,7 +1214,7 @@ class YabotGraph:
         state["responses"] = responses
         return state
 
-    async def _prepare_chat(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def _prepare_chat(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
         incoming = (state.get("incoming") or "").strip()
         active_agent = state.get("active_agent", "meta")
         conv_id, conv = room_active_conv(state)
@@ -1099,7 +1240,7 @@ class YabotGraph:
                 conv_messages = conv.get("messages", [])
                 conv_messages.append(plan_message)
                 conv["messages"] = trim_messages(conv_messages, model, self.max_turns)
-                stream_callback = self._stream_callback.get()
+                stream_callback = self._stream_callback(config)
                 if stream_callback:
                     await stream_callback("[system] Plan:\n- " + "\n- ".join(plan_steps) + "\n")
         return state
@@ -1113,28 +1254,33 @@ class YabotGraph:
         state["agent_route"] = agent_route
         return state
 
-    async def _run_plan_for_agent(self, state: Dict[str, Any], agent_name: str) -> Dict[str, Any]:
+    async def _run_plan_for_agent(
+        self, state: Dict[str, Any], agent_name: str, config: RunnableConfig
+    ) -> Dict[str, Any]:
         conv_id, conv = room_active_conv(state)
         model = conv.get("model", self.default_model)
         agents_loaded = conv.setdefault("agents_loaded", [])
         trace_ctx = self._trace_ctx(state, agent_name, conv_id, model)
         tools = self._tools_for_agent(agent_name)
 
+        stream_callback = self._stream_callback(config)
         start_index = int(state.get("plan_index", 0))
         responses, pending_next = await self._run_plan_steps(
-            state, model, conv, trace_ctx, agents_loaded, agent_name, tools, start_index
+            state, model, conv, trace_ctx, agents_loaded, agent_name, tools, start_index, stream_callback
         )
         if pending_next:
             state["responses"] = responses
             return state
 
         plan_steps = state.get("plan") or []
-        if plan_steps and not self._stream_callback.get():
+        if plan_steps and not stream_callback:
             responses = ["Plan:\n- " + "\n- ".join(plan_steps)] + responses
         state["responses"] = responses
         return state
 
-    async def _run_llm_for_agent(self, state: Dict[str, Any], agent_name: str) -> Dict[str, Any]:
+    async def _run_llm_for_agent(
+        self, state: Dict[str, Any], agent_name: str, config: RunnableConfig
+    ) -> Dict[str, Any]:
         conv_id, conv = room_active_conv(state)
         model = conv.get("model", self.default_model)
         agents_loaded = conv.setdefault("agents_loaded", [])
@@ -1149,6 +1295,7 @@ class YabotGraph:
             agents_loaded,
             agent_name,
             tools,
+            stream_callback=self._stream_callback(config),
         )
         if tool_notices:
             responses = tool_notices + responses
@@ -1161,17 +1308,17 @@ class YabotGraph:
         state["responses"] = responses
         return state
 
-    async def _run_plan_main(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        return await self._run_plan_for_agent(state, "main")
+    async def _run_plan_main(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        return await self._run_plan_for_agent(state, "main", config)
 
-    async def _run_plan_meta(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        return await self._run_plan_for_agent(state, "meta")
+    async def _run_plan_meta(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        return await self._run_plan_for_agent(state, "meta", config)
 
-    async def _run_llm_main(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        return await self._run_llm_for_agent(state, "main")
+    async def _run_llm_main(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        return await self._run_llm_for_agent(state, "main", config)
 
-    async def _run_llm_meta(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        return await self._run_llm_for_agent(state, "meta")
+    async def _run_llm_meta(self, state: Dict[str, Any], config: RunnableConfig) -> Dict[str, Any]:
+        return await self._run_llm_for_agent(state, "meta", config)
 
     def _finalize(self, state: Dict[str, Any]) -> Dict[str, Any]:
         route = state.get("route")
@@ -1,13 +1,106 @@
+import asyncio
 import logging
-from typing import Any
+import time
+import weakref
+from typing import Any, Iterable, List
 
-from nio import InviteMemberEvent, MatrixRoom, MegolmEvent, RoomMessage, UnknownEncryptedEvent
+from nio import InviteMemberEvent, MatrixRoom, MegolmEvent, RoomMessageText, UnknownEncryptedEvent
 
 from .interaction import dispatch_graph, is_stop_command, request_stop
 from matrix_bot.matrix import MatrixMessenger
 from .streams import StreamRegistry
 
 
+DEFAULT_COALESCE_CHARS = 512
+DEFAULT_MAX_CONCURRENT_TURNS = 8
+
+
+def coalesce_responses(bodies: Iterable[str], max_chars: int) -> List[str]:
+    # Consecutive short responses share one Matrix event (paragraph-separated) so a
+    # reply costs fewer sequential homeserver round-trips; order is preserved.
+    merged: List[str] = []
+    for body in bodies:
+        if merged and len(merged[-1]) + 2 + len(body) <= max_chars:
+            merged[-1] = f"{merged[-1]}\n\n{body}"
+        else:
+            merged.append(body)
+    return merged
+
+
+class StreamingReply:
+    # One Matrix message per streamed turn: the first token posts it, later tokens
+    # edit it at most once per interval, and finish() replaces it with the final
+    # responses. The post and the edits run in the background (one in flight, latest
+    # text wins) so a homeserver round-trip never stalls the token stream.
+    def __init__(self, messenger: MatrixMessenger, room_id: str, interval: float) -> None:
+        self.messenger = messenger
+        self.room_id = room_id
+        self.interval = interval
+        self.event_id: str | None = None
+        self._posted = False
+        self._chunks: List[str] = []
+        # "[system]" notices streamed ahead of the model's text (the plan listing) are
+        # not part of the final responses, so finish() keeps them above the final text.
+        self._system_prefix: List[str] = []
+        self._body_started = False
+        self._sent = ""
+        self._last_send = 0.0
+        self._send_task: asyncio.Task[None] | None = None
+
+    async def on_token(self, chunk: str) -> None:
+        self._chunks.append(chunk)
+        if not self._body_started:
+            if chunk.startswith("[system]"):
+                self._system_prefix.append(chunk.strip())
+            elif chunk.strip():
+                self._body_started = True
+        if not self._posted:
+            text = "".join(self._chunks).strip()
+            if text:
+                self._posted = True
+                self._last_send = time.monotonic()
+                self._send_task = asyncio.create_task(self._post(text))
+            return
+        if self._send_task is not None and not self._send_task.done():
+            return
+        if self.event_id is None:
+            return
+        now = time.monotonic()
+        if now - self._last_send < self.interval:
+            return
+        text = "".join(self._chunks).strip()
+        if text != self._sent:
+            self._last_send = now
+            self._send_task = asyncio.create_task(self._edit(self.event_id, text))
+
+    async def _post(self, text: str) -> None:
+        # send_text returns "" when the homeserver rejected the message; the reply then
+        # counts as not posted and finish() sends the final text instead.
+        self.event_id = await self.messenger.send_text(self.room_id, text) or None
+        if self.event_id:
+            self._sent = text
+
+    async def _edit(self, event_id: str, text: str) -> None:
+        await self.messenger.edit_text(self.room_id, event_id, text)
+        self._sent = text
+
+    async def finish(self, bodies: List[str]) -> bool:
+        if not self._posted:
+            return False
+        if self._send_task is not None:
+            await asyncio.gather(self._send_task, return_exceptions=True)
+        if bodies:
+            bodies = [line for line in self._system_prefix if line not in bodies] + bodies
+        final = "\n\n".join(bodies) or "".join(self._chunks).strip()
+        if not final:
+            return True
+        if self.event_id is None:
+            await self.messenger.send_text(self.room_id, final)
+        elif final != self._sent:
+            await self._edit(self.event_id, final)
+        return True
+
+
 class BotHandler:
     def __init__(
         self,
@@ -15,33 +108,51 @@ class BotHandler:
         graph: Any,
         streams: StreamRegistry,
         allowed_users: list[str],
+        coalesce_chars: int = DEFAULT_COALESCE_CHARS,
+        max_concurrent_turns: int = DEFAULT_MAX_CONCURRENT_TURNS,
+        edit_interval: float = 0.0,
     ) -> None:
+        assert max_concurrent_turns > 0, "max_concurrent_turns must be positive"
         self.messenger = messenger
         self.graph = graph
         self.streams = streams
-        self.allowed_users = set(allowed_users)
+        self.allowed_users = frozenset(allowed_users)
+        self.coalesce_chars = coalesce_chars
+        # 0 sends the final responses only; otherwise replies stream into one edited message.
+        self.edit_interval = edit_interval
+        # Caps graph runs in flight so a burst of rooms queues instead of all
+        # contending for the LLM client at once.
+        self._turn_slots = asyncio.Semaphore(max_concurrent_turns)
+        # A room's queued turns wait on its lock before taking a slot; weak values drop
+        # the lock once the room has nothing queued.
+        self._room_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
         self.logger = logging.getLogger("yabot.handler")
+        # The handler is built after login, so the bot's user id is already fixed.
+        self._self_id = messenger.client.user_id
 
-    async def on_message(self, room: MatrixRoom, event: RoomMessage) -> None:
-        self.logger.info(
-            "Message received room=%s sender=%s type=%s decrypted=%s verified=%s",
-            room.room_id,
-            event.sender,
-            type(event).__name__,
-            getattr(event, "decrypted", None),
-            getattr(event, "verified", None),
-        )
-        if event.sender == self.messenger.client.user_id:
-            self.logger.info("Ignoring self message sender=%s", event.sender)
+    async def on_message(self, room: MatrixRoom, event: RoomMessageText) -> None:
+        # Own echoes and disallowed senders are dropped before the receive log is built.
+        if event.sender == self._self_id:
+            self.logger.debug("Ignoring self message sender=%s", event.sender)
             return
         if self.allowed_users and event.sender not in self.allowed_users:
             self.logger.warning("Sender not allowed sender=%s", event.sender)
             return
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "Message received room=%s sender=%s type=%s decrypted=%s verified=%s",
+                room.room_id,
+                event.sender,
+                type(event).__name__,
+                getattr(event, "decrypted", None),
+                getattr(event, "verified", None),
+            )
 
         room_id = room.room_id
-        text = (getattr(event, "body", "") or "").strip()
+        # Only m.text events are routed here (see matrix_app), so body is always a str.
+        text = event.body.strip()
         if not text:
-            self.logger.info("Ignoring non-text message type=%s", type(event).__name__)
+            self.logger.info("Ignoring empty message room=%s", room_id)
             return
 
         if is_stop_command(text):
@@ -51,17 +162,35 @@ class BotHandler:
                 await self.messenger.send_text(room_id, "No active response to stop.")
             return
 
+        reply = StreamingReply(self.messenger, room_id, self.edit_interval) if self.edit_interval > 0 else None
         try:
-            result = await dispatch_graph(self.graph, self.streams, room_id, text)
+            result = await dispatch_graph(
+                self.graph,
+                self.streams,
+                room_id,
+                text,
+                slots=self._turn_slots,
+                on_token=reply.on_token if reply else None,
+                room_lock=self._room_lock(room_id),
+            )
             self.logger.info("Completed graph response room=%s", room_id)
         except Exception as exc:
             self.logger.exception("Graph error room=%s error=%s", room_id, exc)
             await self.messenger.send_text(room_id, "Error while processing request.")
             return
 
-        for body in result.get("responses", []) or []:
+        bodies = result.get("responses", []) or []
+        if reply and await reply.finish(bodies):
+            return
+        for body in coalesce_responses(bodies, self.coalesce_chars):
             await self.messenger.send_text(room_id, body)
 
+    def _room_lock(self, room_id: str) -> asyncio.Lock:
+        lock = self._room_locks.get(room_id)
+        if lock is None:
+            lock = self._room_locks[room_id] = asyncio.Lock()
+        return lock
+
     async def on_decryption_failed(self, room: MatrixRoom, event: MegolmEvent) -> None:
         self.logger.warning(
             "Unable to decrypt message room=%s sender=%s session_id=%s",
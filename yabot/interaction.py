@@ -6,6 +6,9 @@ from .streams import StreamRegistry
 
 
 def is_stop_command(text: str) -> bool:
+    # Ordinary chat never starts with "!stop"; only those reach the regex parser.
+    if text[:5].lower() != "!stop":
+        return False
     parsed = parse_command(text)
     return bool(parsed and parsed[0] == "stop")
 
@@ -24,12 +27,39 @@ async def dispatch_graph(
     text: str,
     on_start: Callable[[], Awaitable[None]] | None = None,
     on_done: Callable[[], Awaitable[None]] | None = None,
+    slots: asyncio.Semaphore | None = None,
+    on_token: Callable[[str], Awaitable[None]] | None = None,
+    room_lock: asyncio.Lock | None = None,
 ) -> dict[str, Any]:
     assert room_id, "room_id is required"
     assert text is not None, "text is required"
     if on_start:
         await on_start()
-    task = asyncio.create_task(graph.ainvoke(room_id, text))
+
+    stream_fn = getattr(graph, "ainvoke_stream", None) if on_token else None
+
+    async def invoke() -> dict[str, Any]:
+        if callable(stream_fn):
+            return await stream_fn(room_id, text, on_token=on_token)
+        return await graph.ainvoke(room_id, text)
+
+    async def take_slot() -> dict[str, Any]:
+        if slots is None:
+            return await invoke()
+        async with slots:
+            return await invoke()
+
+    async def run() -> dict[str, Any]:
+        # Waiting for a slot happens inside the registered task, so !stop can
+        # cancel a queued turn as well as a running one. The room lock is taken
+        # first: a backlog in one room then waits without holding slots that
+        # other rooms could use.
+        if room_lock is None:
+            return await take_slot()
+        async with room_lock:
+            return await take_slot()
+
+    task = asyncio.create_task(run())
     streams.register(room_id, task)
     try:
         return await task
@@ -1,14 +1,75 @@
+import asyncio
 import json
+import weakref
 from typing import Any, Awaitable, Callable, Dict, List
 
-from openai import AsyncOpenAI
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
 from .tools import TOOLS
 
 
+# httpx pools belong to the loop that opened their connections, so each running loop gets
+# its own HTTP/2 client; close_shared_clients() tears it down when that loop shuts down.
+_HTTP_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncOpenAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def shared_http_client() -> httpx.AsyncClient:
+    # One pooled HTTP/2 client per loop: the tool-call follow-up requests reuse warm
+    # connections and multiplex instead of opening new TLS sessions.
+    loop = asyncio.get_running_loop()
+    client = _HTTP_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = _HTTP_CLIENTS[loop] = DefaultAsyncHttpxClient(
+            http2=True,
+            # Sized for concurrent room streams plus their tool follow-ups; idle
+            # connections stay warm across the gaps between chat turns.
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=100, keepalive_expiry=60),
+        )
+        _CLIENTS.pop(loop, None)
+    return client
+
+
+async def close_shared_clients() -> None:
+    loop = asyncio.get_running_loop()
+    _CLIENTS.pop(loop, None)
+    client = _HTTP_CLIENTS.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def _get_client(api_key: str) -> AsyncOpenAI:
+    # Rebuilt graphs (reloads, tests, the meta agent) keep the same pool for a key.
+    http_client = shared_http_client()
+    clients = _CLIENTS.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(api_key)
+    if client is None:
+        client = clients[api_key] = AsyncOpenAI(api_key=api_key, http_client=http_client)
+    return client
+
+
 class LLMClient:
-    def __init__(self, api_key: str) -> None:
-        self.client = AsyncOpenAI(api_key=api_key)
+    def __init__(self, api_key: str, http_client: httpx.AsyncClient | None = None) -> None:
+        self.api_key = api_key
+        self._client: AsyncOpenAI | None = None
+        if http_client is not None:
+            self._client = AsyncOpenAI(api_key=api_key, http_client=http_client)
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        # Resolved per call so a client built outside any loop binds to the loop using it.
+        if self._client is not None:
+            return self._client
+        return _get_client(self.api_key)
+
+    @client.setter
+    def client(self, client: AsyncOpenAI) -> None:
+        self._client = client
 
     async def create_message(
         self, model: str, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]] | None = None
@@ -60,36 +121,53 @@ class LLMClient:
         assert response is not None, "LLM stream response is None"
         content_chunks: List[str] = []
         tool_calls_by_index: Dict[int, Dict[str, Any]] = {}
+        # Argument deltas are joined once at the end; += on a dict value copies the whole
+        # string per delta, which is quadratic for large payloads like write_file content.
+        argument_chunks: Dict[int, List[str]] = {}
+        append_content = content_chunks.append
+        # OpenAI opens tool-call indices in ascending order, so insertion order is the
+        # result order unless an index shows up below one already seen.
+        last_index = -1
+        out_of_order = False
+        # Stream deltas are SDK models whose optional fields default to None, so plain
+        # attribute reads replace getattr probes in this per-event loop.
         async for event in response:
-            choices = getattr(event, "choices", None) or []
+            choices = event.choices
             if not choices:
                 continue
-            delta = getattr(choices[0], "delta", None)
+            delta = choices[0].delta
             if not delta:
                 continue
-            content = getattr(delta, "content", None)
+            content = delta.content
             if content:
-                content_chunks.append(content)
+                append_content(content)
                 if on_token:
                     await on_token(content)
-            tool_deltas = getattr(delta, "tool_calls", None) or []
+            tool_deltas = delta.tool_calls
+            if not tool_deltas:
+                continue
             for tool_delta in tool_deltas:
-                index = int(getattr(tool_delta, "index", 0))
-                entry = tool_calls_by_index.setdefault(
-                    index, {"id": "", "function": {"name": "", "arguments": ""}}
-                )
-                tool_id = getattr(tool_delta, "id", None)
-                if tool_id:
-                    entry["id"] = tool_id
-                function = getattr(tool_delta, "function", None)
+                index = int(tool_delta.index or 0)
+                entry = tool_calls_by_index.get(index)
+                if entry is None:
+                    entry = tool_calls_by_index[index] = {"id": "", "function": {"name": "", "arguments": ""}}
+                    argument_chunks[index] = []
+                    out_of_order = out_of_order or index < last_index
+                    last_index = index
+                if tool_delta.id:
+                    entry["id"] = tool_delta.id
+                function = tool_delta.function
                 if function:
-                    name = getattr(function, "name", None)
-                    if name:
-                        entry["function"]["name"] = name
-                    arguments = getattr(function, "arguments", None)
-                    if arguments:
-                        entry["function"]["arguments"] += arguments
-        tool_calls = [tool_calls_by_index[i] for i in sorted(tool_calls_by_index)]
+                    if function.name:
+                        entry["function"]["name"] = function.name
+                    if function.arguments:
+                        argument_chunks[index].append(function.arguments)
+        for index, chunks in argument_chunks.items():
+            tool_calls_by_index[index]["function"]["arguments"] = "".join(chunks)
+        if out_of_order:
+            tool_calls = [tool_calls_by_index[i] for i in sorted(tool_calls_by_index)]
+        else:
+            tool_calls = list(tool_calls_by_index.values())
         content = "".join(content_chunks) or None
         if tool_calls:
             for call in tool_calls:
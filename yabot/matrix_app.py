@@ -1,11 +1,12 @@
 import asyncio
 import logging
 
-from nio import InviteMemberEvent, MegolmEvent, RoomMessage, SyncResponse, UnknownEncryptedEvent
+from nio import InviteMemberEvent, MegolmEvent, RoomMessageText, SyncResponse, UnknownEncryptedEvent
 
 from .config import load_config
 from matrix_bot.cross_signing import CrossSigningManager
 from .handler import BotHandler
+from .llm import close_shared_clients
 from .remote import RemoteGraphClient
 from .runtime import build_graph
 from matrix_bot.matrix import MatrixMessenger, auto_trust_devices, login_or_restore
@@ -42,9 +43,12 @@ async def main() -> None:
         graph,
         streams,
         config.allowed_users,
+        coalesce_chars=config.matrix_coalesce_chars,
+        max_concurrent_turns=config.max_concurrent_turns,
+        edit_interval=config.matrix_edit_interval,
     )
 
-    client.add_event_callback(handler.on_message, RoomMessage)
+    client.add_event_callback(handler.on_message, RoomMessageText)
     client.add_event_callback(handler.on_decryption_failed, MegolmEvent)
     client.add_event_callback(handler.on_unknown_encrypted, UnknownEncryptedEvent)
     client.add_event_callback(handler.on_invite, InviteMemberEvent)
@@ -61,6 +65,8 @@ async def main() -> None:
     finally:
         if isinstance(graph, RemoteGraphClient):
             await graph.close()
+        else:
+            await close_shared_clients()
         await client.close()
 
 
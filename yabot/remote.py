@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import asyncio
-import uuid
+import itertools
 from typing import Any, Awaitable, Callable
 
 import websockets
@@ -12,21 +12,35 @@ class RemoteGraphClient:
     def __init__(self, url: str) -> None:
         self.url = url
         self._ws: websockets.WebSocketClientProtocol | None = None
-        self._send_lock = asyncio.Lock()
+        # Frames go out through one writer task; callers enqueue and go straight to
+        # awaiting their reply instead of queueing on a lock around the socket.
+        self._send_queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._sender_task: asyncio.Task[None] | None = None
         self._receiver_task: asyncio.Task[None] | None = None
         self._pending: dict[str, asyncio.Future[dict[str, Any]]] = {}
         self._stream_callbacks: dict[str, Callable[[str], Awaitable[None]]] = {}
+        # Ids only pair replies with requests on this client's socket, so a counter suffices.
+        self._request_ids = itertools.count(1)
 
     async def connect(self) -> None:
+        # The receiver loop ends when the socket closes, so a live receiver task is a
+        # version-independent "still open" check without probing the socket object.
+        if self._receiver_task is not None and not self._receiver_task.done():
+            return
         if self._ws is None or self._is_closed(self._ws):
             self._ws = await websockets.connect(self.url)
             self._receiver_task = asyncio.create_task(self._receiver_loop())
+            if self._sender_task is None or self._sender_task.done():
+                self._sender_task = asyncio.create_task(self._sender_loop())
 
     async def close(self) -> None:
         if self._ws is not None and not self._is_closed(self._ws):
             await self._ws.close()
         if self._receiver_task is not None:
             self._receiver_task.cancel()
+        if self._sender_task is not None:
+            self._sender_task.cancel()
+        self._reject_queued()
         for future in self._pending.values():
             if not future.done():
                 future.set_exception(RuntimeError("Connection closed."))
@@ -34,6 +48,7 @@ class RemoteGraphClient:
         self._stream_callbacks.clear()
         self._ws = None
         self._receiver_task = None
+        self._sender_task = None
 
     @staticmethod
     def _is_closed(ws: Any) -> bool:
@@ -54,12 +69,11 @@ class RemoteGraphClient:
         assert text is not None, "text must be set"
         await self.connect()
         assert self._ws is not None
-        request_id = str(uuid.uuid4())
+        request_id = format(next(self._request_ids), "x")
         future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
         self._pending[request_id] = future
         payload = ClientMessage(type="message", id=request_id, room_id=room_id, text=text).to_json()
-        async with self._send_lock:
-            await self._ws.send(payload)
+        self._send_queue.put_nowait((request_id, payload))
         return await future
 
     async def ainvoke_stream(self, room_id: str, text: str, on_token: Any) -> dict[str, Any]:
@@ -68,13 +82,12 @@ class RemoteGraphClient:
         assert callable(on_token), "on_token must be callable"
         await self.connect()
         assert self._ws is not None
-        request_id = str(uuid.uuid4())
+        request_id = format(next(self._request_ids), "x")
         future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
         self._pending[request_id] = future
         self._stream_callbacks[request_id] = on_token
         payload = ClientMessage(type="message", id=request_id, room_id=room_id, text=text).to_json()
-        async with self._send_lock:
-            await self._ws.send(payload)
+        self._send_queue.put_nowait((request_id, payload))
         try:
             return await future
         finally:
@@ -84,15 +97,45 @@ class RemoteGraphClient:
         assert room_id, "room_id must be set"
         await self.connect()
         assert self._ws is not None
-        request_id = str(uuid.uuid4())
+        request_id = format(next(self._request_ids), "x")
         future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
         self._pending[request_id] = future
         payload = ClientMessage(type="stop", id=request_id, room_id=room_id).to_json()
-        async with self._send_lock:
-            await self._ws.send(payload)
+        self._send_queue.put_nowait((request_id, payload))
         result = await future
         return bool(result.get("ok"))
 
+    async def _sender_loop(self) -> None:
+        try:
+            while True:
+                request_id, payload = await self._send_queue.get()
+                if request_id not in self._pending:
+                    # Already failed when its connection dropped; never replay it on a new one.
+                    continue
+                try:
+                    assert self._ws is not None, "sender running without a connection"
+                    await self._ws.send(payload)
+                except Exception as exc:
+                    self._fail_request(request_id, exc)
+        finally:
+            self._reject_queued()
+
+    def _reject_queued(self) -> None:
+        # Frames that never went out fail their callers now rather than leaving them
+        # waiting on a reply that cannot come.
+        while True:
+            try:
+                request_id, _ = self._send_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            self._fail_request(request_id, RuntimeError("Connection closed."))
+
+    def _fail_request(self, request_id: str, exc: BaseException) -> None:
+        future = self._pending.pop(request_id, None)
+        self._stream_callbacks.pop(request_id, None)
+        if future is not None and not future.done():
+            future.set_exception(exc)
+
     async def _receiver_loop(self) -> None:
         assert self._ws is not None
         try:
@@ -125,6 +168,7 @@ class RemoteGraphClient:
                 else:
                     future.set_exception(RuntimeError("Unknown response type"))
         finally:
+            self._reject_queued()
             for future in self._pending.values():
                 if not future.done():
                     future.set_exception(RuntimeError("Connection closed."))
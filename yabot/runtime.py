@@ -8,12 +8,17 @@ from .graph import YabotGraph
 from .llm import LLMClient
 from .skills import load_skills
 from .system_prompt import meta_system_prompt, system_prompt
+from .tools.registry import set_tool_workers
 from .trace import TraceLogger
 
 
 def build_graph(config: Config) -> YabotGraph:
     llm = LLMClient(api_key=config.openai_api_key)
-    checkpointer = FileBackedSaver(f"{config.data_dir}/graph_state.pkl")
+    set_tool_workers(config.tool_workers)
+    checkpointer = FileBackedSaver(
+        f"{config.data_dir}/graph_state.pkl",
+        flush_delay=config.state_flush_delay,
+    )
 
     builtin_skills_dir = Path(__file__).resolve().parent.parent / "skills"
     user_skills_dir = Path(config.data_dir) / "skills"
@@ -5,6 +5,7 @@ from typing import Iterable
 
 
 FRONTMATTER_BOUNDARY = "---"
+SLUG_RE = re.compile(r"[^a-zA-Z0-9]+")
 
 
 @dataclass(frozen=True)
@@ -19,24 +20,24 @@ class SkillRegistry:
     def __init__(self, skills: list[Skill]) -> None:
         self.skills = skills
         self.by_tool_name = {skill.tool_name: skill for skill in skills}
+        # Skills are fixed once loaded, so the tool schemas are built once and shared.
+        self._tool_defs = [
+            {
+                "type": "function",
+                "function": {
+                    "name": skill.tool_name,
+                    "description": skill.description,
+                    "parameters": {
+                        "type": "object",
+                        "properties": {},
+                    },
+                },
+            }
+            for skill in skills
+        ]
 
     def tool_defs(self) -> list[dict]:
-        tools: list[dict] = []
-        for skill in self.skills:
-            tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": skill.tool_name,
-                        "description": skill.description,
-                        "parameters": {
-                            "type": "object",
-                            "properties": {},
-                        },
-                    },
-                }
-            )
-        return tools
+        return self._tool_defs
 
     def is_skill_tool(self, tool_name: str) -> bool:
         return tool_name in self.by_tool_name
@@ -47,7 +48,7 @@ class SkillRegistry:
 
 def load_skills(paths: Iterable[str | Path]) -> SkillRegistry:
     skills: list[Skill] = []
-    used_tool_names: set[str] = set()
+    used_tool_names: dict[str, int] = {}
 
     for path in paths:
         base = Path(path)
@@ -61,7 +62,7 @@ def load_skills(paths: Iterable[str | Path]) -> SkillRegistry:
     return SkillRegistry(skills)
 
 
-def _load_skill_file(path: Path, used_tool_names: set[str]) -> Skill | None:
+def _load_skill_file(path: Path, used_tool_names: dict[str, int]) -> Skill | None:
     text = path.read_text(encoding="utf-8")
     frontmatter, body = _split_frontmatter(text)
     if not frontmatter:
@@ -73,46 +74,53 @@ def _load_skill_file(path: Path, used_tool_names: set[str]) -> Skill | None:
         return None
 
     tool_name = _unique_tool_name(_slugify(name), used_tool_names)
-    used_tool_names.add(tool_name)
     content = body.strip()
     return Skill(name=name, description=description, content=content, tool_name=tool_name)
 
 
 def _split_frontmatter(text: str) -> tuple[dict[str, str] | None, str]:
-    lines = text.splitlines()
-    if not lines or lines[0].strip() != FRONTMATTER_BOUNDARY:
+    # Walks the header line by line with find() and slices the body once, so a long
+    # skill body is never split into lines just to be joined back together.
+    pos = text.find("\n")
+    if pos == -1 or text[:pos].strip() != FRONTMATTER_BOUNDARY:
         return None, text
 
-    end_idx = None
-    for idx in range(1, len(lines)):
-        if lines[idx].strip() == FRONTMATTER_BOUNDARY:
-            end_idx = idx
-            break
-    if end_idx is None:
-        return None, text
-
-    frontmatter_lines = lines[1:end_idx]
-    body = "\n".join(lines[end_idx + 1 :])
     data: dict[str, str] = {}
-    for line in frontmatter_lines:
-        if ":" not in line:
-            continue
-        key, value = line.split(":", 1)
-        data[key.strip()] = value.strip()
-    return data, body
+    start = pos + 1
+    while start <= len(text):
+        end = text.find("\n", start)
+        line = text[start:] if end == -1 else text[start:end]
+        if line.strip() == FRONTMATTER_BOUNDARY:
+            body = "" if end == -1 else text[end + 1 :]
+            if "\r" in body:
+                body = "\n".join(body.splitlines())
+            return data, body
+        if ":" in line:
+            key, value = line.split(":", 1)
+            data[key.strip()] = value.strip()
+        if end == -1:
+            break
+        start = end + 1
+    return None, text
 
 
 def _slugify(name: str) -> str:
-    slug = re.sub(r"[^a-zA-Z0-9]+", "_", name.strip().lower()).strip("_")
+    slug = SLUG_RE.sub("_", name.strip().lower()).strip("_")
     if not slug:
         slug = "skill"
     return f"skill__{slug}"
 
 
-def _unique_tool_name(base: str, used: set[str]) -> str:
+def _unique_tool_name(base: str, used: dict[str, int]) -> str:
+    # `used` maps every taken name to the next suffix worth trying for it, so many
+    # skills sharing a slug do not rescan the suffixes already handed out.
     if base not in used:
+        used[base] = 2
         return base
-    idx = 2
+    idx = used[base]
     while f"{base}_{idx}" in used:
         idx += 1
-    return f"{base}_{idx}"
+    used[base] = idx + 1
+    name = f"{base}_{idx}"
+    used[name] = 2
+    return name
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+from functools import cache
 
+
+@cache
 def system_prompt() -> str:
     return "\n".join(
         [
@@ -14,6 +17,7 @@ def system_prompt() -> str:
     )
 
 
+@cache
 def meta_system_prompt() -> str:
     return "\n".join(
         [
@@ -26,6 +30,7 @@ def meta_system_prompt() -> str:
     )
 
 
+@cache
 def planner_system_prompt() -> str:
     return "\n".join(
         [
@@ -37,6 +42,7 @@ def planner_system_prompt() -> str:
     )
 
 
+@cache
 def coder_system_prompt() -> str:
     return "\n".join(
         [
@@ -48,6 +54,7 @@ def coder_system_prompt() -> str:
     )
 
 
+@cache
 def browser_system_prompt() -> str:
     return "\n".join(
         [
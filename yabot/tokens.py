@@ -1,8 +1,13 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 import json
 
-import tiktoken
+if TYPE_CHECKING:
+    import tiktoken
 
 
 MODELS_DATA_PATH = Path(__file__).with_name("models.json")
@@ -14,9 +19,13 @@ PRIMING_TOKENS = 3
 
 
 def context_window_for_model(model: str) -> int:
-    windows = _context_windows()
-    assert model in windows, f"Unknown model context window: {model}"
-    return windows[model]
+    # Called on every trim; after the first load this is a single dict lookup.
+    windows = _MODELS_CONTEXT_WINDOWS
+    if windows is None:
+        windows = _context_windows()
+    window = windows.get(model)
+    assert window is not None, f"Unknown model context window: {model}"
+    return window
 
 
 def _context_windows() -> dict[str, int]:
@@ -24,7 +33,7 @@ def _context_windows() -> dict[str, int]:
     if _MODELS_CONTEXT_WINDOWS is None:
         from_file = _load_models_context_windows()
         assert from_file, "models.json is missing or invalid"
-        _MODELS_CONTEXT_WINDOWS = dict(from_file)
+        _MODELS_CONTEXT_WINDOWS = from_file
     return _MODELS_CONTEXT_WINDOWS
 
 
@@ -32,7 +41,8 @@ def _load_models_context_windows() -> dict[str, int]:
     if not MODELS_DATA_PATH.exists():
         return {}
     try:
-        payload = json.loads(MODELS_DATA_PATH.read_text(encoding="utf-8"))
+        # json.loads detects UTF-8 bytes itself, skipping a separate decode of the payload.
+        payload = json.loads(MODELS_DATA_PATH.read_bytes())
     except (OSError, json.JSONDecodeError):
         return {}
     models = _models_from_payload(payload)
@@ -113,19 +123,48 @@ def output_reserve_tokens(context_window: int) -> int:
     return max(2048, int(context_window * 0.1))
 
 
+@lru_cache(maxsize=32)
 def get_encoding(model: str) -> tiktoken.Encoding:
+    # Model-name resolution (and the fallback for unknown models) runs once per model.
+    # tiktoken is imported here: histories under the byte bound never tokenize, so
+    # processes that only run commands or short chats skip loading it.
+    import tiktoken
+
     try:
         return tiktoken.encoding_for_model(model)
     except Exception:
         return tiktoken.get_encoding("cl100k_base")
 
 
+TOKEN_COUNT_CACHE_SIZE = 4096
+# (encoding name, length, hash) -> token count. Keyed by hash rather than the text so
+# the cache holds only ints, not copies of old messages and tool results.
+_token_counts: OrderedDict[tuple[str, int, int], int] = OrderedDict()
+
+
+def _count_tokens(encoding: tiktoken.Encoding, text: str) -> int:
+    # History is re-estimated every turn once it nears the budget; counts for
+    # unchanged message fields are reused instead of re-running the tokenizer.
+    # Message text is counted as plain text: encode_ordinary skips the special-token
+    # scan (and does not raise when a message happens to contain "<|endoftext|>").
+    key = (encoding.name, len(text), hash(text))
+    count = _token_counts.get(key)
+    if count is not None:
+        _token_counts.move_to_end(key)
+        return count
+    count = len(encoding.encode_ordinary(text))
+    _token_counts[key] = count
+    if len(_token_counts) > TOKEN_COUNT_CACHE_SIZE:
+        _token_counts.popitem(last=False)
+    return count
+
+
 def estimate_message_tokens(message: Dict[str, Any], encoding: tiktoken.Encoding) -> int:
     total = TOKENS_PER_MESSAGE
     for key, value in message.items():
         if value is None:
             continue
-        total += len(encoding.encode(str(value)))
+        total += _count_tokens(encoding, str(value))
         if key == "name":
             total += TOKENS_PER_NAME
     return total
@@ -139,3 +178,20 @@ def estimate_messages_tokens(messages: List[Dict[str, Any]], encoding: tiktoken.
         total += estimate_message_tokens(message, encoding)
     total += PRIMING_TOKENS
     return total
+
+
+def messages_tokens_upper_bound(messages: List[Dict[str, Any]]) -> int:
+    # Byte-level BPE never emits more tokens than UTF-8 bytes, so this bounds
+    # estimate_messages_tokens without running the tokenizer.
+    if not messages:
+        return 0
+    total = PRIMING_TOKENS
+    for message in messages:
+        total += TOKENS_PER_MESSAGE
+        for key, value in message.items():
+            if value is None:
+                continue
+            total += len(str(value).encode("utf-8"))
+            if key == "name":
+                total += TOKENS_PER_NAME
+    return total
@@ -1,11 +1,14 @@
-from typing import Any, Dict
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
 
 from .ask_user import TOOL as ASK_USER_TOOL, ask_user
 from .create_dir import TOOL as CREATE_DIR_TOOL, create_dir
 from .get_skills_dir import TOOL as GET_SKILLS_DIR_TOOL, get_skills_dir
 from .list_dir import TOOL as LIST_DIR_TOOL, list_dir
 from .read_file import TOOL as READ_FILE_TOOL, read_file
-from .run_shell import TOOL as RUN_SHELL_TOOL, run_shell, run_shell_async
+from .run_shell import TOOL as RUN_SHELL_TOOL, run_shell
 from .write_file import TOOL as WRITE_FILE_TOOL, write_file
 
 
@@ -19,26 +22,55 @@ TOOLS = [
     RUN_SHELL_TOOL,
 ]
 
+# Tools that only compute a value without touching the filesystem; running them inline
+# is cheaper than an executor hop. Anything doing I/O (list_dir reads the directory) is not.
+# run_shell goes through the pool too: spawning from a worker keeps fork/exec off the loop
+# and lets concurrent rooms start commands in parallel.
+INLINE_TOOLS = frozenset({"get_skills_dir"})
+DEFAULT_TOOL_WORKERS = 16
+_tool_pool: ThreadPoolExecutor | None = None
+_tool_workers = DEFAULT_TOOL_WORKERS
+
+
+def set_tool_workers(max_workers: int) -> None:
+    global _tool_pool, _tool_workers
+    assert max_workers > 0, "tool workers must be positive"
+    _tool_workers = max_workers
+    if _tool_pool is not None:
+        _tool_pool.shutdown(wait=False)
+        _tool_pool = None
+
+
+def _tool_executor() -> ThreadPoolExecutor:
+    # Tools get their own pool so concurrent rooms don't compete with other
+    # users of the loop's default executor (input reading, trace flushing).
+    global _tool_pool
+    if _tool_pool is None:
+        _tool_pool = ThreadPoolExecutor(max_workers=_tool_workers, thread_name_prefix="yabot-tool")
+    return _tool_pool
+
+
+_DISPATCH: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "list_dir": lambda args: list_dir(str(args.get("path", ""))),
+    "ask_user": lambda args: ask_user(str(args.get("question", ""))),
+    "read_file": lambda args: read_file(str(args.get("path", ""))),
+    "write_file": lambda args: write_file(str(args.get("path", "")), str(args.get("content", ""))),
+    "create_dir": lambda args: create_dir(str(args.get("path", "")), bool(args.get("exist_ok", False))),
+    "get_skills_dir": lambda args: get_skills_dir(str(args.get("app_name", "yabot"))),
+    "run_shell": lambda args: run_shell(str(args.get("command", "")), args.get("workdir")),
+}
+
 
 def execute_tool(name: str, arguments: Dict[str, Any]) -> str:
-    if name == "list_dir":
-        return list_dir(str(arguments.get("path", "")))
-    if name == "ask_user":
-        return ask_user(str(arguments.get("question", "")))
-    if name == "read_file":
-        return read_file(str(arguments.get("path", "")))
-    if name == "write_file":
-        return write_file(str(arguments.get("path", "")), str(arguments.get("content", "")))
-    if name == "create_dir":
-        return create_dir(str(arguments.get("path", "")), bool(arguments.get("exist_ok", False)))
-    if name == "get_skills_dir":
-        return get_skills_dir(str(arguments.get("app_name", "yabot")))
-    if name == "run_shell":
-        return run_shell(str(arguments.get("command", "")), arguments.get("workdir"))
-    return f"ERROR: unknown tool {name}"
+    handler = _DISPATCH.get(name)
+    if handler is None:
+        return f"ERROR: unknown tool {name}"
+    return handler(arguments)
 
 
 async def execute_tool_async(name: str, arguments: Dict[str, Any]) -> str:
-    if name == "run_shell":
-        return await run_shell_async(str(arguments.get("command", "")), arguments.get("workdir"))
-    return execute_tool(name, arguments)
+    if name in INLINE_TOOLS:
+        return execute_tool(name, arguments)
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_tool_executor(), context.run, execute_tool, name, arguments)
@@ -1,58 +1,66 @@
-import asyncio
-import json
+import os
+import selectors
 import subprocess
+import time
 
-from .util import truncate
+from .util import MAX_OUTPUT_CHARS, dumps, truncate
 
+# Matches the head truncate() decodes from bytes, so nothing it would keep is dropped.
+OUTPUT_BYTES_CAP = 4 * MAX_OUTPUT_CHARS + 4
+SHELL_TIMEOUT = 60
+_READ_CHUNK = 64 * 1024
 
-def run_shell(command: str, workdir: str | None = None) -> str:
-    assert command, "command is required"
-    try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            cwd=workdir,
-            capture_output=True,
-            text=True,
-            timeout=60,
-        )
-        payload = {
-            "command": command,
-            "workdir": workdir,
-            "returncode": result.returncode,
-            "stdout": truncate(result.stdout),
-            "stderr": truncate(result.stderr),
-        }
-        return json.dumps(payload)
-    except Exception as exc:
-        return json.dumps({"error": str(exc), "command": command, "workdir": workdir})
 
+def _collect_output(proc: subprocess.Popen[bytes], timeout: float) -> tuple[bytes, bytes]:
+    # Both pipes are drained to EOF so the child never stalls on a full pipe, but only
+    # the first OUTPUT_BYTES_CAP bytes of each are kept; the rest is dropped as it arrives.
+    deadline = time.monotonic() + timeout
+    assert proc.stdout is not None and proc.stderr is not None
+    heads = {proc.stdout: bytearray(), proc.stderr: bytearray()}
+    with selectors.DefaultSelector() as selector:
+        for stream in heads:
+            selector.register(stream, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(proc.args, timeout)
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, _READ_CHUNK)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    continue
+                head = heads[key.fileobj]
+                if len(head) < OUTPUT_BYTES_CAP:
+                    head += chunk[: OUTPUT_BYTES_CAP - len(head)]
+    proc.wait(timeout=max(deadline - time.monotonic(), 0))
+    return bytes(heads[proc.stdout]), bytes(heads[proc.stderr])
 
-async def run_shell_async(command: str, workdir: str | None = None) -> str:
+
+def run_shell(command: str, workdir: str | None = None) -> str:
     assert command, "command is required"
     try:
-        proc = await asyncio.create_subprocess_shell(
+        with subprocess.Popen(
             command,
+            shell=True,
             cwd=workdir,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        try:
-            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=60)
-        except asyncio.TimeoutError:
-            proc.kill()
-            await proc.communicate()
-            raise
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        ) as proc:
+            try:
+                stdout, stderr = _collect_output(proc, SHELL_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                raise
         payload = {
             "command": command,
             "workdir": workdir,
             "returncode": proc.returncode,
-            "stdout": truncate(stdout.decode(errors="replace")),
-            "stderr": truncate(stderr.decode(errors="replace")),
+            "stdout": truncate(stdout),
+            "stderr": truncate(stderr),
         }
-        return json.dumps(payload)
+        return dumps(payload)
     except Exception as exc:
-        return json.dumps({"error": str(exc), "command": command, "workdir": workdir})
+        return dumps({"error": str(exc), "command": command, "workdir": workdir})
 
 
 TOOL = {
@@ -1,7 +1,24 @@
+import json
+from typing import Any
+
 MAX_OUTPUT_CHARS = 8000
+TRUNC_SUFFIX = "\n...(truncated)"
 
 
-def truncate(text: str, limit: int = MAX_OUTPUT_CHARS) -> str:
+def truncate(text: str | bytes, limit: int = MAX_OUTPUT_CHARS) -> str:
+    if isinstance(text, (bytes, bytearray)):
+        # A UTF-8 char is at most 4 bytes, so this head still decodes to more than
+        # limit chars when the input is long; the discarded tail is never decoded.
+        text = text[: 4 * limit + 4].decode("utf-8", errors="replace")
     if len(text) <= limit:
         return text
-    return text[:limit] + "\n...(truncated)"
+    return text[:limit] + TRUNC_SUFFIX
+
+
+# Tool results are read by the model, not humans; skip the default ", "/": " padding.
+# A shared encoder avoids json.dumps building one per call for non-default separators.
+_ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+
+def dumps(payload: Any) -> str:
+    return _ENCODER.encode(payload)
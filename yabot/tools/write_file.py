@@ -1,14 +1,31 @@
+import os
 from pathlib import Path
 
+WRITE_CHUNK_CHARS = 1 << 20
+
 
 def write_file(path: str, content: str) -> str:
     assert path, "path is required"
     try:
-        parent = Path(path).parent
-        if parent and not parent.exists():
-            return f"ERROR: parent directory does not exist: {parent}"
-        Path(path).write_text(content, encoding="utf-8")
-        return f"OK: wrote {len(content)} bytes to {path}"
+        # No separate parent check: open() fails the same way, and skipping it saves a stat.
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        except FileNotFoundError:
+            return f"ERROR: parent directory does not exist: {Path(path).parent}"
+        except NotADirectoryError:
+            return f"ERROR: a path component is not a directory: {Path(path).parent}"
+        written = 0
+        try:
+            # Encode a slice at a time so a large file never exists as one full bytes copy.
+            for start in range(0, len(content), WRITE_CHUNK_CHARS):
+                data = memoryview(content[start : start + WRITE_CHUNK_CHARS].encode("utf-8"))
+                while data:
+                    count = os.write(fd, data)
+                    written += count
+                    data = data[count:]
+        finally:
+            os.close(fd)
+        return f"OK: wrote {written} bytes to {path}"
     except Exception as exc:
         return f"ERROR: {exc}"
 
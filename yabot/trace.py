@@ -1,33 +1,124 @@
 from __future__ import annotations
 
+import atexit
+import fcntl
 import json
+import logging
+import os
+import queue
+import select
 import threading
-from dataclasses import dataclass
-from datetime import datetime, timezone
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+FLUSH_TIMEOUT = 5.0
+logger = logging.getLogger("yabot.trace")
 
-@dataclass(frozen=True)
+# Shared so each event skips json.dumps constructing an encoder for non-default options.
+_ENCODER = json.JSONEncoder(ensure_ascii=True, separators=(",", ":"), default=str)
+
+
+@dataclass(frozen=True, slots=True)
 class TraceLogger:
     path: Path
     schema_version: int = 1
+    _lines: queue.Queue[str] = field(init=False, repr=False, compare=False)
+    # (epoch second, formatted "YYYY-MM-DDTHH:MM:SS") reused for every event in that second.
+    _ts_cache: list[tuple[int, str]] = field(init=False, repr=False, compare=False)
+    _fd: int = field(init=False, repr=False, compare=False)
+    _writer: threading.Thread = field(init=False, repr=False, compare=False)
+    # errno of the last failed write; a repeat of the same failure is not logged again.
+    _last_errno: list[int | None] = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        object.__setattr__(self, "_lock", threading.Lock())
         self.path.touch(exist_ok=True)
+        # Lines are serialized on the caller's side (payloads reference live state)
+        # and appended by a writer thread, so the event loop never blocks on file IO.
+        object.__setattr__(self, "_lines", queue.Queue())
+        object.__setattr__(self, "_ts_cache", [(0, "")])
+        object.__setattr__(self, "_last_errno", [None])
+        # Opened here so an unwritable path fails in the caller, not in the writer thread.
+        object.__setattr__(self, "_fd", os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644))
+        writer = threading.Thread(target=self._write_lines, name="yabot-trace", daemon=True)
+        object.__setattr__(self, "_writer", writer)
+        writer.start()
+        atexit.register(self.flush)
 
     def log(self, event: str, data: dict[str, Any], context: dict[str, Any] | None = None) -> None:
         payload = {
-            "ts": datetime.now(timezone.utc).isoformat(),
+            "ts": self._timestamp(),
             "schema_version": self.schema_version,
             "event": event,
             **(context or {}),
             **data,
         }
-        line = json.dumps(payload, ensure_ascii=True, default=str)
-        lock: threading.Lock = getattr(self, "_lock")
-        with lock:
-            with self.path.open("a", encoding="utf-8") as handle:
-                handle.write(line + "\n")
+        self._lines.put(_ENCODER.encode(payload))
+
+    def _timestamp(self) -> str:
+        # Same shape as datetime.now(timezone.utc).isoformat(), but the date/time part
+        # is only formatted once per second.
+        now = time.time()
+        second = int(now)
+        ts_cache = self._ts_cache
+        cached = ts_cache[0]
+        if cached[0] != second:
+            cached = (second, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second)))
+            ts_cache[0] = cached
+        return f"{cached[1]}.{int((now - second) * 1_000_000):06d}+00:00"
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT) -> None:
+        # Waits like Queue.join, but gives up after timeout or if the writer is gone, so a
+        # stuck disk cannot hang every turn (graph invokes flush) or interpreter exit.
+        lines = self._lines
+        deadline = time.monotonic() + timeout
+        with lines.all_tasks_done:
+            while lines.unfinished_tasks and self._writer.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("Timed out flushing trace log %s", self.path)
+                    break
+                lines.all_tasks_done.wait(min(remaining, 0.1))
+
+    def _write_lines(self) -> None:
+        lines = self._lines
+        # Lines are ASCII (ensure_ascii) and each batch is one O_APPEND write, so there is
+        # no text or buffer layer to go through. Small batches are atomic appends, so other
+        # processes writing the same file (CLI and daemon) cannot interleave with them.
+        while True:
+            batch = [lines.get()]
+            while True:
+                try:
+                    batch.append(lines.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch("".join(line + "\n" for line in batch).encode("ascii"))
+                self._last_errno[0] = None
+            except OSError as exc:
+                # Tracing is best-effort: the batch is dropped and the thread keeps serving
+                # later lines; turns never see the error.
+                if self._last_errno[0] != exc.errno:
+                    self._last_errno[0] = exc.errno
+                    logger.error("Failed to write trace log %s: %s", self.path, exc)
+            finally:
+                for _ in batch:
+                    lines.task_done()
+
+    def _write_batch(self, payload: bytes) -> None:
+        fd = self._fd
+        data = memoryview(payload)
+        if len(data) <= select.PIPE_BUF:
+            data = data[os.write(fd, data) :]
+            if not data:
+                return
+        # Large (or short-written) batches are not guaranteed to land in one append, so
+        # serialize them with other yabot processes sharing the file via an advisory lock.
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            while data:
+                data = data[os.write(fd, data) :]
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import random
 from collections.abc import Awaitable, Callable
 
 
@@ -8,12 +9,26 @@ async def retry_until_ok(
     fn: Callable[[], Awaitable[None]],
     delay_seconds: float,
     cancel_event: asyncio.Event | None = None,
+    max_delay_seconds: float | None = None,
 ) -> None:
+    # Waits double after each failure up to max_delay_seconds (fixed delay when unset),
+    # with up to 10% jitter so retriers started together spread out.
+    max_delay = delay_seconds if max_delay_seconds is None else max_delay_seconds
+    attempt = 0
     while True:
         try:
             await fn()
             return
         except Exception:
-            if cancel_event is not None and cancel_event.is_set():
+            delay = min(max_delay, delay_seconds * 2**attempt)
+            delay += random.uniform(0, delay / 10)
+            attempt += 1
+            if cancel_event is None:
+                await asyncio.sleep(delay)
+                continue
+            # Waiting on the event instead of sleeping lets cancellation end the wait at once.
+            try:
+                await asyncio.wait_for(cancel_event.wait(), timeout=delay)
                 return
-            await asyncio.sleep(delay_seconds)
+            except asyncio.TimeoutError:
+                pass
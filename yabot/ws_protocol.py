@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import json
 from dataclasses import dataclass
-from typing import Any, Literal
+from json.encoder import encode_basestring_ascii as _quote
+from typing import Any, Callable, Iterator, Literal
 
 
 MessageType = Literal["message", "stop"]
 ResponseType = Literal["response", "stopped", "cancelled", "error", "stream"]
+COMPACT_SEPARATORS = (",", ":")
+FRAME_CHARS = 64 * 1024
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ClientMessage:
     type: MessageType
     id: str
@@ -17,13 +20,15 @@ class ClientMessage:
     text: str | None = None
 
     def to_json(self) -> str:
-        payload: dict[str, Any] = {"type": self.type, "id": self.id, "room_id": self.room_id}
-        if self.text is not None:
-            payload["text"] = self.text
-        return json.dumps(payload)
+        # Every field is a string, so the two possible shapes are written out directly with
+        # the encoder's own C string escaper; no payload dict, same text as json.dumps.
+        head = f'{{"type":{_quote(self.type)},"id":{_quote(self.id)},"room_id":{_quote(self.room_id)}'
+        if self.text is None:
+            return head + "}"
+        return f'{head},"text":{_quote(self.text)}}}'
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ServerMessage:
     type: ResponseType
     id: str
@@ -43,8 +48,68 @@ class ServerMessage:
             payload["error"] = self.error
         if self.chunk is not None:
             payload["chunk"] = self.chunk
-        return json.dumps(payload)
+        return _ENCODER.encode(payload)
+
+    def iter_json(self, frame_chars: int = FRAME_CHARS) -> Iterator[str]:
+        # Same text as to_json, handed out in pieces of at least frame_chars so a large
+        # result never has to exist as one string; the peak is its largest top-level field.
+        pending: list[str] = []
+        size = 0
+        for piece in self._iter_pieces():
+            pending.append(piece)
+            size += len(piece)
+            if size >= frame_chars:
+                yield "".join(pending)
+                pending = []
+                size = 0
+        if pending:
+            yield "".join(pending)
+
+    def _iter_pieces(self) -> Iterator[str]:
+        head = {"type": self.type, "id": self.id, "room_id": self.room_id}
+        yield _ENCODER.encode(head)[:-1]
+        if self.result is not None:
+            # Each value goes through the C encoder in one shot; JSONEncoder.iterencode
+            # would fall back to the pure-Python encoder.
+            separator = ',"result":{'
+            for key, value in self.result.items():
+                # json.dumps writes non-str keys (e.g. an int thread_id) as their str form.
+                yield f"{separator}{_quote(str(key))}:"
+                yield _ENCODER.encode(value)
+                separator = ","
+            yield "}" if separator == "," else ',"result":{}'
+        for key, value in (("ok", self.ok), ("error", self.error), ("chunk", self.chunk)):
+            if value is not None:
+                yield f',"{key}":{json.dumps(value)}'
+        yield "}"
+
+
+def stream_frame_encoder(request_id: str, room_id: str) -> Callable[[str], str]:
+    # Stream frames go out once per token and differ only in the chunk, so the
+    # constant head is encoded once per request; output matches ServerMessage.to_json.
+    head = ServerMessage(type="stream", id=request_id, room_id=room_id).to_json()[:-1]
+    prefix = f'{head},"chunk":'
+
+    def encode(chunk: str) -> str:
+        return f"{prefix}{_quote(chunk)}}}"
+
+    return encode
+
+
+def _json_default(value: Any) -> Any:
+    # Graph state keeps approvals as sets; the wire format carries them as lists.
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# json.dumps builds a fresh JSONEncoder whenever any option differs from the defaults;
+# one shared instance skips that per message and encodes with the same C fast path.
+_ENCODER = json.JSONEncoder(separators=COMPACT_SEPARATORS, default=_json_default)
 
 
-def parse_json(raw: str) -> dict[str, Any]:
-    return json.loads(raw)
+def parse_json(raw: str | bytes) -> dict[str, Any]:
+    # Binary frames arrive as bytes; json.loads takes them as-is, no decode first.
+    payload = json.loads(raw)
+    assert isinstance(payload, dict), "message must be a JSON object"
+    return payload